@@ -2,10 +2,16 @@
 # For each genome make a chart that shows the signal with the most likely locations of real functional motifs.
 
 import os
+import sys
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bioutils.decimate import plot_decimated
+from bioutils.fasta import read_fasta_records
+from bioutils.result_cache import ResultCache, file_digest
+
 exon_intron_motifs = [
     "GTCATTACTA",
     "ACACAATAGA",
@@ -38,19 +44,11 @@ position_weight_matrix = np.log2(relative_frequency_matrix / background_probabil
 
 def parse_fasta_file(file_path):
   
-    sequence_data = ""
     try:
-        with open(file_path, 'r', encoding='utf-8') as fasta_file:
-            for line in fasta_file:
-                line = line.strip()
-                if line.startswith(">"):
-                    # Skip header lines
-                    continue
-                sequence_data += line.upper()
+        return [(record_id, sequence.decode('ascii')) for record_id, sequence in read_fasta_records(file_path)]
     except FileNotFoundError:
         print(f"Error: File {file_path} not found.")
-        return ""
-    return sequence_data
+        return []
 
 
 def calculate_motif_scores(genome_sequence, pwm_matrix, window_size):
@@ -71,6 +69,25 @@ def calculate_motif_scores(genome_sequence, pwm_matrix, window_size):
     return score_array
 
 
+def score_genome_records(genome_records):
+    # Score each record separately so no window spans two segments;
+    # offsets[i] is where record i's windows start in the returned scores
+    motif_scores = []
+    offsets = []
+    for _, record_sequence in genome_records:
+        offsets.append(len(motif_scores))
+        motif_scores.extend(calculate_motif_scores(record_sequence, position_weight_matrix, motif_width))
+    return {'scores': np.array(motif_scores, dtype=float), 'offsets': np.array(offsets, dtype=np.int64)}
+
+
+def locate_in_records(score_indices, score_offsets, genome_records):
+    # Maps indices into the per-record scores back to (record id, position in record, position in genome)
+    record_starts = np.cumsum([0] + [len(sequence) for _, sequence in genome_records])
+    records = np.searchsorted(score_offsets, score_indices, side='right') - 1
+    within = score_indices - score_offsets[records]
+    return [genome_records[r][0] for r in records], within, record_starts[records] + within
+
+
 def identify_top_scoring_regions(score_list, num_peaks=5):
     
     scores_array = np.array(score_list)
@@ -86,6 +103,9 @@ subplot_axes = subplot_axes.flatten()
 
 number_of_genomes = 10
 successfully_processed = 0
+result_cache = ResultCache()
+score_params = {'motifs': exon_intron_motifs, 'pseudocount': pseudocount_value,
+                'background': background_probability}
 
 for genome_index in range(1, number_of_genomes + 1):
     fasta_filename = f"Influenza{genome_index}.fasta"
@@ -103,25 +123,32 @@ for genome_index in range(1, number_of_genomes + 1):
         ax.axis('off')
         continue
     
-    genome_sequence = parse_fasta_file(fasta_filename)
+    genome_records = parse_fasta_file(fasta_filename)
+    genome_sequence = "".join(sequence for _, sequence in genome_records)
     
     if not genome_sequence:
         print(f"  ⚠ Error: Could not read sequence from {fasta_filename}")
         print()
         continue
     
-    motif_scores = calculate_motif_scores(genome_sequence, position_weight_matrix, motif_width)
+    scored = result_cache.cached(file_digest(fasta_filename), 'motif_scores_by_record', score_params,
+                                 lambda: score_genome_records(genome_records))
+    motif_scores, score_offsets = scored['scores'], scored['offsets']
     
-    candidate_positions, candidate_scores = identify_top_scoring_regions(motif_scores, num_peaks=5)
+    candidate_indices, candidate_scores = identify_top_scoring_regions(motif_scores, num_peaks=5)
+    candidate_records, record_positions, candidate_positions = locate_in_records(
+        candidate_indices, score_offsets, genome_records)
+    score_positions = locate_in_records(np.arange(len(motif_scores)), score_offsets, genome_records)[2]
     
-    print(f"  Sequence length: {len(genome_sequence)} bp")
-    print(f"  Top 5 motif candidates found at positions: {candidate_positions. tolist()}")
+    print(f"  Sequence length: {len(genome_sequence)} bp in {len(genome_records)} record(s)")
+    print(f"  Top 5 motif candidates found at positions: "
+          f"{[f'{record}:{position}' for record, position in zip(candidate_records, record_positions.tolist())]}")
     print(f"  Corresponding scores: {[f'{score:.3f}' for score in candidate_scores]}")
     print()
     
     ax = subplot_axes[genome_index - 1]
     
-    ax.plot(motif_scores, color='steelblue', linewidth=0.8, alpha=0.7, 
+    plot_decimated(ax, score_positions, motif_scores, color='steelblue', linewidth=0.8, alpha=0.7, 
             label='Motif Score Landscape')
     
     ax.scatter(candidate_positions, candidate_scores, 
@@ -144,6 +171,7 @@ for genome_index in range(1, number_of_genomes + 1):
 
 print("=" * 80)
 print(f"ANALYSIS COMPLETE: {successfully_processed}/{number_of_genomes} genomes processed successfully")
+print(result_cache.summary())
 print("=" * 80)
 print()
 
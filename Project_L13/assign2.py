@@ -5,8 +5,14 @@ import os
 from pathlib import Path
 from multiprocessing import Pool, cpu_count
 from functools import partial
+import sys
 import time
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bioutils.result_cache import ResultCache, content_digest
+
+worker_cache = None
+
 def read_fasta(filename: str) -> Dict[str, str]:
     sequences = {}
     current_id = None
@@ -87,8 +93,17 @@ def plot_pattern(cg_values: List[float], ic_values: List[float],
     plt.savefig(filename, dpi=300, bbox_inches='tight')
     plt.close()
 
-def analyze_promoter(sequence: str, window_size: int = 30) -> dict:
-    cg_values, ic_values = sliding_window_analysis(sequence, window_size)
+def cached_window_analysis(sequence: str, window_size: int, cache: ResultCache) -> Tuple[np.ndarray, np.ndarray]:
+    windows = cache.cached(content_digest(sequence), 'cg_ic_windows', {'window_size': window_size},
+                           lambda: dict(zip(('cg_values', 'ic_values'),
+                                            map(np.array, sliding_window_analysis(sequence, window_size)))))
+    return windows['cg_values'], windows['ic_values']
+
+def analyze_promoter(sequence: str, window_size: int = 30, cache: ResultCache = None) -> dict:
+    if cache is None:
+        cg_values, ic_values = sliding_window_analysis(sequence, window_size)
+    else:
+        cg_values, ic_values = cached_window_analysis(sequence, window_size, cache)
     center = calculate_center_of_weight(cg_values, ic_values)
     
     return {
@@ -101,13 +116,19 @@ def analyze_promoter(sequence: str, window_size: int = 30) -> dict:
         'window_count': len(cg_values)
     }
 
+def init_worker():
+    global worker_cache
+    worker_cache = ResultCache()
+
 def process_single_sequence(args):
     idx, seq_id, sequence, window_size, output_dir = args
     
     if len(sequence) < window_size:
         return None
     
-    results = analyze_promoter(sequence, window_size)
+    hits_before = worker_cache.hits if worker_cache else 0
+    results = analyze_promoter(sequence, window_size, worker_cache)
+    cache_hit = worker_cache is not None and worker_cache.hits > hits_before
     
     safe_id = "". join(c if c.isalnum() or c in (' ', '_', '-') else '_' for c in seq_id)
     safe_id = safe_id[:100]
@@ -123,7 +144,8 @@ def process_single_sequence(args):
         'seq_id': seq_id,
         'center': results['center'],
         'results': results,
-        'output_file': output_file
+        'output_file': output_file,
+        'cache_hit': cache_hit
     }
 
 def plot_all_centers(centers: List[Tuple[float, float]], labels: List[str], filename: str):
@@ -160,7 +182,7 @@ def process_fasta_file_parallel(fasta_file: str, window_size: int = 30, output_d
     
     start_time = time.time()
     
-    with Pool(processes=n_cores) as pool:
+    with Pool(processes=n_cores, initializer=init_worker) as pool:
         results_list = []
         total = len(args_list)
         
@@ -177,7 +199,9 @@ def process_fasta_file_parallel(fasta_file: str, window_size: int = 30, output_d
     elapsed_time = time.time() - start_time
     
     print(f"\n✓ Processed {len(results_list)} sequences in {elapsed_time:.2f} seconds")
-    print(f"  Average: {elapsed_time/len(results_list):.3f} seconds per sequence\n")
+    print(f"  Average: {elapsed_time/len(results_list):.3f} seconds per sequence")
+    cache_hits = sum(1 for r in results_list if r['cache_hit'])
+    print(f"  Cached window analyses reused: {cache_hits}/{len(results_list)}\n")
     
     all_centers = [r['center'] for r in results_list]
     all_labels = [f"Seq {r['idx']}" for r in results_list]
@@ -4,45 +4,21 @@
 # 2. For each combination, find out the percentage inside the S sequence.
 # 3. Show the percentage for each combination in the output of your implementation.
     
-S = "TACGTGCGCGCGAGCTATCTACTGACTTACGACTAGTGTAGCTGCATCATCGATCGA"
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bioutils.kmers import decode_kmer, dense_kmer_counts
 
-def generate_2combinations(letters):
-    combos = []
-    for l1 in letters:
-        for l2 in letters:
-            combos.append(l1 + l2)
-    return combos
-
-def generate_3combinations(letters):
-    combos = []
-    for l1 in letters:
-        for l2 in letters:
-            for l3 in letters: 
-                combos.append(l1 + l2 + l3)
-    return combos
+S = "TACGTGCGCGCGAGCTATCTACTGACTTACGACTAGTGTAGCTGCATCATCGATCGA"
 
 def count_combinations_and_percentages(sequence, length):
-    letters = ['A', 'C', 'G', 'T']
-    if(length == 2):
-        combinations = generate_2combinations(letters)
-    if(length == 3):
-        combinations = generate_3combinations(letters)
-    total = len(sequence) - length + 1
-    counts = {combo: 0 for combo in combinations}
-
-    for combo in combinations:
-        for i in range(total):
-            match = True
-            for j in range(length):
-                if sequence[i + j] != combo[j]:
-                    match = False
-                    break
-            if match:
-                counts[combo] += 1
+    counts = dense_kmer_counts(sequence, length)
+    total = max(len(sequence) - length + 1, 1)
 
     percentages = {}
-    for combo in combinations:
-        percentages[combo] = (counts[combo] / total) * 100
+    for code, count in enumerate(counts):
+        percentages[decode_kmer(code, length)] = (count / total) * 100
 
     return percentages
 
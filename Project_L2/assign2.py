@@ -3,6 +3,15 @@
 
 # ex: S = "abaa"
 
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bioutils.kmer_db import load_or_build_kmer_db
+from bioutils.kmers import decode_kmer
+from bioutils.kmer_stream import count_kmers_in_file
+from bioutils.sketch import accuracy_report, sketch_fasta
+
 S = "TACGTGCGCGCGAGCTATCTACTGACTTACGACTAGTGTAGCTGCATCATCGATCGA"
 
 def find_existing_combinations(sequence, length):
@@ -19,14 +28,47 @@ def find_existing_combinations(sequence, length):
     percentages = {combo: (count / total) * 100 for combo, count in counts.items()}
     return percentages
 
-di_percentages = find_existing_combinations(S, 2)
+def find_existing_combinations_in_file(filename, length, spill_dir=None):
+    # Counts come from a .kmerdb file next to the FASTA, built once by the sharded counter
+    with load_or_build_kmer_db(filename, length, spill_dir=spill_dir) as db:
+        total = db.total()
+        return {decode_kmer(int(code), length): (int(count) / total) * 100
+                for code, count in zip(db.codes, db.counts)}
+
+def sketch_combinations_in_file(filename, length, epsilon=1e-4, hll_error=0.01, compare_exact=False):
+    # Fixed-memory approximation for large k. Only with compare_exact is the exact spectrum also
+    # counted, to report how close the sketches came; that count needs memory for every k-mer.
+    cms, hll = sketch_fasta(filename, length, epsilon=epsilon, hll_error=hll_error)
+    if not compare_exact:
+        return cms, hll, None
+    codes, counts = count_kmers_in_file(filename, length)
+    return cms, hll, accuracy_report(codes, counts, cms, hll)
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[2] == "--sketch":
+        # usage: assign2.py genome.fasta --sketch [k] [--exact]
+        options = sys.argv[3:]
+        compare_exact = "--exact" in options
+        sizes = [option for option in options if option != "--exact"]
+        k = int(sizes[0]) if sizes else 21
+        cms, hll, report = sketch_combinations_in_file(sys.argv[1], k, compare_exact=compare_exact)
+        print(f"Approximate distinct {k}-mers: {hll.cardinality():,.0f} (expected error {hll.error:.1%})")
+        print(f"Count overestimate bound: {cms.error_bound():,.0f}")
+        for name, value in (report or {}).items():
+            print(f"{name}: {value}")
+        sys.exit(0)
 
-tri_percentages = find_existing_combinations(S, 3)
+    if len(sys.argv) > 1:
+        di_percentages = find_existing_combinations_in_file(sys.argv[1], 2)
+        tri_percentages = find_existing_combinations_in_file(sys.argv[1], 3)
+    else:
+        di_percentages = find_existing_combinations(S, 2)
+        tri_percentages = find_existing_combinations(S, 3)
 
-print("Dinucleotide Percentages from Sequence: ")
-for combo, perc in sorted(di_percentages.items()):
-    print(f"{combo}: {perc:.2f}%")
+    print("Dinucleotide Percentages from Sequence: ")
+    for combo, perc in sorted(di_percentages.items()):
+        print(f"{combo}: {perc:.2f}%")
 
-print("Trinucleotide Percentages from Sequence: ")
-for combo, perc in sorted(tri_percentages.items()):
-    print(f"{combo}: {perc:.2f}%")
\ No newline at end of file
+    print("Trinucleotide Percentages from Sequence: ")
+    for combo, perc in sorted(tri_percentages.items()):
+        print(f"{combo}: {perc:.2f}%")
@@ -4,16 +4,28 @@
 # Thus, your input should be the DNA sequence from the FASTA file, and the output should be values of the relative frequencies for each symbol from the alphabet (sequence).
 # Translate in lines on a chart, thus your chart in the case of DNA should contain 4 lines, one for each symbol found over the sequence.
 
+import os
+import queue
+from collections import OrderedDict
+import sys
+import threading
 import tkinter as tk
-from tkinter import filedialog, messagebox
+from tkinter import filedialog, messagebox, ttk
 import matplotlib.pyplot as plt
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from Bio import SeqIO
 import numpy as np
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bioutils.decimate import plot_decimated
+from bioutils.fasta_index import FastaIndex
+from bioutils.windows import window_frequencies
+
 DNA_ALPHABET = ['A', 'C', 'G', 'T']
 WINDOW_SIZE = 30
+ANALYSIS_BLOCK = 1_000_000  # windows computed between cancellation/progress checks
+MAX_CACHED_TRACKS = 8
+POLL_INTERVAL_MS = 50
 
 class FastaAnalyzerApp:
     def __init__(self, root):
@@ -22,6 +34,14 @@ class FastaAnalyzerApp:
         self.root.geometry("1000x750") 
 
         self.current_file_path = None 
+        self.fasta_index = None
+
+        self.track_cache = OrderedDict()  # least recently plotted first
+        self.analysis_queue = queue.Queue()
+        self.analysis_job = 0
+        self.analysis_key = None
+        self.cancel_event = None
+        self.polling = False
 
         top_frame = tk.Frame(self.root, pady=5)
         top_frame.pack(side="top", fill="x")
@@ -48,6 +68,13 @@ class FastaAnalyzerApp:
         )
         self.lbl_file_path.pack(side="left")
 
+        self.selected_record = tk.StringVar(value="")
+        self.record_menu = tk.OptionMenu(top_frame, self.selected_record, "")
+        self.record_menu.config(state="disabled")
+        self.record_menu.pack(side="right", padx=20)
+        lbl_record = tk.Label(top_frame, text="Record:")
+        lbl_record.pack(side="right")
+
         self.smoothing_enabled = tk.BooleanVar(value=True)
         self.smoothing_window_size = tk.IntVar(value=51) # Default smoothing window
 
@@ -76,6 +103,13 @@ class FastaAnalyzerApp:
         )
         self.spin_smoothing_window.pack(side="left")
 
+        self.btn_cancel = tk.Button(control_frame, text="Cancel", command=self.cancel_analysis, state="disabled")
+        self.btn_cancel.pack(side="right", padx=20)
+        self.progress = ttk.Progressbar(control_frame, length=200, mode="determinate", maximum=1.0)
+        self.progress.pack(side="right")
+        self.lbl_status = tk.Label(control_frame, text="", fg="gray")
+        self.lbl_status.pack(side="right", padx=10)
+
         self.fig = Figure(figsize=(8, 6), dpi=100)
         self.ax = self.fig.add_subplot(111)
         self.canvas = FigureCanvasTkAgg(self.fig, master=chart_frame)
@@ -100,10 +134,36 @@ class FastaAnalyzerApp:
             filetypes=(("FASTA files", "*.fasta *.fa *.fna"), ("All files", "*.*"))
         )
         if file_path:
+            try:
+                fasta_index = FastaIndex(file_path)
+            except (OSError, ValueError) as e:
+                messagebox.showerror("Error", f"Could not index the selected file: {e}")
+                return
+            if not len(fasta_index):
+                fasta_index.close()
+                messagebox.showerror("Error", "The selected file is empty or not a valid FASTA file.")
+                return
+            self.cancel_analysis()
+            if self.fasta_index:
+                self.fasta_index.close()
+            self.fasta_index = fasta_index
             self.current_file_path = file_path # Store the file path
             self.lbl_file_path.config(text=file_path, fg="black")
+            self._populate_record_menu()
             self.process_and_plot()
 
+    def _populate_record_menu(self):
+        menu = self.record_menu["menu"]
+        menu.delete(0, "end")
+        for name in self.fasta_index.names:
+            menu.add_command(label=name, command=lambda n=name: self._select_record(n))
+        self.selected_record.set(self.fasta_index.names[0])
+        self.record_menu.config(state="normal")
+
+    def _select_record(self, name):
+        self.selected_record.set(name)
+        self._trigger_replot()
+
     def _trigger_replot(self):
         if self.current_file_path:
             self.process_and_plot()
@@ -122,68 +182,161 @@ class FastaAnalyzerApp:
         if not self.current_file_path:
             return
 
+        record_id = self.selected_record.get()
         try:
-            fasta_sequences = SeqIO.parse(open(self.current_file_path), 'fasta')
-            first_record = next(fasta_sequences)
-            sequence = str(first_record.seq).upper()
-            
+            key = (self.current_file_path, os.path.getmtime(self.current_file_path), record_id)
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not read the selected file: {e}")
+            return
+
+        # Smoothing changes only redo the convolution on cached raw tracks
+        if key in self.track_cache:
+            self.track_cache.move_to_end(key)
+            frequencies, window_positions = self.track_cache[key]
+            self.plot_tracks(frequencies, window_positions, record_id)
+            return
+
+        # The running analysis already computes these tracks; the smoothing settings are read
+        # when its result is plotted
+        if self.cancel_event and self.analysis_key == key:
+            return
+
+        self.start_analysis(key)
+
+    def start_analysis(self, key):
+        self.cancel_analysis()
+        self.analysis_job += 1
+        self.cancel_event = threading.Event()
+        self.analysis_key = key
+        self.progress["value"] = 0
+        self.lbl_status.config(text=f"Analyzing {key[2]}...")
+        self.btn_cancel.config(state="normal")
+        worker = threading.Thread(
+            target=self._run_analysis,
+            args=(self.analysis_job, key, self.cancel_event),
+            daemon=True
+        )
+        worker.start()
+        if not self.polling:
+            self.polling = True
+            self.root.after(POLL_INTERVAL_MS, self._poll_analysis_queue)
+
+    def cancel_analysis(self):
+        if self.cancel_event:
+            self.cancel_event.set()
+            self.cancel_event = None
+            self.analysis_job += 1
+            self.lbl_status.config(text="Cancelled")
+            self.progress["value"] = 0
+            self.btn_cancel.config(state="disabled")
+
+    def _run_analysis(self, job, key, cancel_event):
+        # Runs in a worker thread; results go back to the Tk thread through the queue
+        path, _, record_id = key
+        try:
+            with FastaIndex(path) as fasta_index:
+                sequence = fasta_index.fetch(record_id)
             if len(sequence) < WINDOW_SIZE:
-                messagebox.showerror("Error", f"Sequence length is too short.")
+                self.analysis_queue.put(("error", job, "Sequence length is too short."))
                 return
 
-            frequencies, window_positions = self.sliding_window_analysis(sequence)
+            total_windows = len(sequence) - WINDOW_SIZE + 1
+            blocks = []
+            for start in range(0, total_windows, ANALYSIS_BLOCK):
+                if cancel_event.is_set():
+                    return
+                end = min(start + ANALYSIS_BLOCK, total_windows)
+                frequencies, _ = self.sliding_window_analysis(sequence[start:end + WINDOW_SIZE - 1])
+                blocks.append(frequencies)
+                self.analysis_queue.put(("progress", job, end / total_windows))
+
+            frequencies = {symbol: np.concatenate([block[symbol] for block in blocks]) for symbol in DNA_ALPHABET}
+            window_positions = np.arange(total_windows)
+            self.analysis_queue.put(("done", job, (key, frequencies, window_positions)))
+        except KeyError:
+            self.analysis_queue.put(("error", job, "The selected record is not present in the FASTA index."))
+        except Exception as e:
+            self.analysis_queue.put(("error", job, f"An unexpected error occurred: {e}"))
+
+    def _poll_analysis_queue(self):
+        finished = False
+        while True:
+            try:
+                kind, job, payload = self.analysis_queue.get_nowait()
+            except queue.Empty:
+                break
+            if job != self.analysis_job:
+                continue  # stale message from a cancelled run
+            if kind == "progress":
+                self.progress["value"] = payload
+            elif kind == "done":
+                finished = True
+                key, frequencies, window_positions = payload
+                self._store_tracks(key, frequencies, window_positions)
+                self._finish_analysis("")
+                self.plot_tracks(frequencies, window_positions, key[2])
+            elif kind == "error":
+                finished = True
+                self._finish_analysis("Failed")
+                messagebox.showerror("Error", payload)
+                self.setup_initial_chart()
+
+        if not finished and self.cancel_event:
+            self.root.after(POLL_INTERVAL_MS, self._poll_analysis_queue)
+        else:
+            self.polling = False
+
+    def _finish_analysis(self, status):
+        self.cancel_event = None
+        self.lbl_status.config(text=status)
+        self.progress["value"] = 0
+        self.btn_cancel.config(state="disabled")
+
+    def _store_tracks(self, key, frequencies, window_positions):
+        self.track_cache[key] = (frequencies, window_positions)
+        while len(self.track_cache) > MAX_CACHED_TRACKS:
+            del self.track_cache[next(iter(self.track_cache))]
 
+    def plot_tracks(self, frequencies, window_positions, record_id):
+        try:
             is_smoothed = self.smoothing_enabled.get()
             smooth_win_size = self.smoothing_window_size.get()
+        except tk.TclError:
+            return  # spinbox is being edited and does not hold a number yet
 
-            if is_smoothed and len(window_positions) > smooth_win_size:
-                smoothed_frequencies = {}
-                for symbol in DNA_ALPHABET:
-                    smoothed_frequencies[symbol] = self.apply_smoothing(
-                        frequencies[symbol], smooth_win_size
-                    )
-                
-                offset = (smooth_win_size - 1) // 2
-                adjusted_positions = window_positions[offset:-offset]
-                
-                self.plot_frequencies(
-                    smoothed_frequencies, 
-                    adjusted_positions, 
-                    first_record.id, 
-                    is_smoothed, 
-                    smooth_win_size
-                )
-            else:
-                self.plot_frequencies(
-                    frequencies, 
-                    window_positions, 
-                    first_record.id
+        if is_smoothed and len(window_positions) > smooth_win_size:
+            smoothed_frequencies = {}
+            for symbol in DNA_ALPHABET:
+                smoothed_frequencies[symbol] = self.apply_smoothing(
+                    frequencies[symbol], smooth_win_size
                 )
-
-        except StopIteration:
-            messagebox.showerror("Error", "The selected file is empty or not a valid FASTA file.")
-        except Exception as e:
-            messagebox.showerror("An Error Occurred", f"An unexpected error occurred: {e}")
-            self.setup_initial_chart()
+            
+            offset = (smooth_win_size - 1) // 2
+            adjusted_positions = window_positions[offset:len(window_positions) - offset]
+            
+            self.plot_frequencies(
+                smoothed_frequencies, 
+                adjusted_positions, 
+                record_id, 
+                is_smoothed, 
+                smooth_win_size
+            )
+        else:
+            self.plot_frequencies(
+                frequencies, 
+                window_positions, 
+                record_id
+            )
 
     def sliding_window_analysis(self, sequence):
-        frequencies = {symbol: [] for symbol in DNA_ALPHABET}
-        window_positions = []
-        for i in range(len(sequence) - WINDOW_SIZE + 1):
-            window = sequence[i : i + WINDOW_SIZE]
-            for symbol in DNA_ALPHABET:
-                count = window.count(symbol)
-                relative_freq = count / WINDOW_SIZE
-                frequencies[symbol].append(relative_freq)
-            window_positions.append(i)
-        return frequencies, window_positions
+        return window_frequencies(sequence, WINDOW_SIZE, alphabet="".join(DNA_ALPHABET))
 
     def plot_frequencies(self, frequencies, positions, sequence_id, is_smoothed=False, smoothing_window=0):
         self.ax.clear()
         colors = {'A': 'blue', 'C': 'green', 'G': 'orange', 'T': 'red'}
         
         for symbol in DNA_ALPHABET:
-            self.ax.plot(positions, frequencies[symbol], label=f"Freq of '{symbol}'", color=colors[symbol])
+            plot_decimated(self.ax, positions, frequencies[symbol], label=f"Freq of '{symbol}'", color=colors[symbol])
 
         title = f"Nucleotide Frequencies for: {sequence_id}"
         if is_smoothed:
@@ -9,6 +9,12 @@
 # Output = temperature in celsius
 
 import math
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bioutils.melting import nn_tm
+
 def formula1(dna):
     dna = dna.upper()
     g = dna.count('G')
@@ -25,9 +31,17 @@ def formula2(dna, na_conc=0.05):
     tm = 81.5 + 16.6 * math.log10(na_conc) + 0.41 * gc_percent - (600 / length)
     return tm
 
+def formula3(dna, na_conc=0.05, mg_conc=0.0, dntp_conc=0.0, oligo_conc=0.25e-6):
+    # SantaLucia nearest-neighbor model, concentrations in mol/L; needs at least one base pair step
+    if len(dna) < 2:
+        return math.nan
+    return nn_tm(dna.upper(), na_conc, mg_conc, dntp_conc, oligo_conc)
+
 if __name__ == "__main__":
     dna = input("Enter DNA sequence: ").strip()
     tm1 = formula1(dna)
     tm2 = formula2(dna)
+    tm3 = formula3(dna)
     print(f"\nFirst formula: {tm1:.2f} °C")
     print(f"Second formula: {tm2:.2f} °C")
+    print(f"Nearest-neighbor: {tm3:.2f} °C")
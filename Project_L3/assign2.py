@@ -1,16 +1,19 @@
 # Design an application that uses the sliding window method in order to read the melting temperature over the sequence S.
 # Use a sliding window of 8 positions and choose a fasta file as input.
 import math
+import os
+import sys
 import matplotlib.pyplot as plt
 from scipy.signal import savgol_filter
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bioutils.decimate import plot_decimated
+from bioutils.fasta import read_fasta_records
+from bioutils.melting import tm_profile
+
 def read_fasta(filename):
-    sequence = ""
-    with open(filename, "r") as file:
-        for line in file:
-            if not line.startswith(">"): 
-                sequence += line.strip().upper()
-    return sequence
+    # One (record id, sequence) pair per record, so no Tm window spans two records
+    return [(record_id, sequence.decode("ascii")) for record_id, sequence in read_fasta_records(filename)]
 
 def formula1(dna):
     dna = dna.upper()
@@ -29,17 +32,9 @@ def formula2(dna, na_conc=0.05):
     return tm
 
 
-def sliding_window_tm(seq, window_size=8):
-    tm_form1 = []
-    tm_form2= []
-    positions = []
-
-    for i in range(len(seq) - window_size + 1):
-        window = seq[i:i + window_size]
-        tm_form1.append(formula1(window))
-        tm_form2.append(formula2(window))
-        positions.append(i + 1)
-
+def sliding_window_tm(seq, window_size=8, step=1, na_conc=0.05):
+    starts, tm_form1, tm_form2 = tm_profile(seq, window_size, step, na_conc)
+    positions = starts + 1
     return positions, tm_form1, tm_form2
 
 
@@ -52,15 +47,25 @@ def smooth_data(values, window_length=5, polyorder=2):
 
 def main():
     fasta_file = input("Enter FASTA filename: ").strip()
-    seq = read_fasta(fasta_file)
+    records = read_fasta(fasta_file)
     window_size = 8
-    positions, tm_form1, tm_form2 = sliding_window_tm(seq, window_size)
-    data1 = smooth_data(tm_form1, window_length=15, polyorder=2)
-    data2 = smooth_data(tm_form2, window_length=15, polyorder=2)
     plt.figure(figsize=(10, 6))
-    plt.plot(positions, data1, label="Formula 1", color="blue", linewidth=2)
-    plt.plot(positions, data2, label="Formula 2", color="red", linewidth=2)
-    plt.title(f"Melting Temperature (Tm) Profile\nWindow size = {window_size}")
+    # Each record is profiled and smoothed on its own and drawn at its offset in the file,
+    # with a dotted line where the next record starts
+    offset = 0
+    labels = ("Formula 1", "Formula 2")
+    for index, (_, seq) in enumerate(records):
+        if index:
+            plt.axvline(offset + 1, color="gray", linestyle=":", linewidth=1)
+        if len(seq) >= window_size:
+            positions, tm_form1, tm_form2 = sliding_window_tm(seq, window_size)
+            data1 = smooth_data(tm_form1, window_length=15, polyorder=2)
+            data2 = smooth_data(tm_form2, window_length=15, polyorder=2)
+            plot_decimated(plt.gca(), positions + offset, data1, label=labels[0], color="blue", linewidth=2)
+            plot_decimated(plt.gca(), positions + offset, data2, label=labels[1], color="red", linewidth=2)
+            labels = (None, None)
+        offset += len(seq)
+    plt.title(f"Melting Temperature (Tm) Profile\nWindow size = {window_size}, {len(records)} record(s)")
     plt.xlabel("Start position of window")
     plt.ylabel("Tm (°C)")
     plt.legend()
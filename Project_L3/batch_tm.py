@@ -0,0 +1,25 @@
+# Batch version of assign1: melting temperatures for every oligo in a CSV or FASTA file (optionally gzip).
+# All oligos are encoded into one buffer and formula1, formula2 and the nearest-neighbor model
+# are evaluated in a single vectorized pass, then written to CSV or Parquet.
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bioutils.oligo_batch import process_oligo_file
+
+
+def main():
+    input_file = input("Enter oligo file (CSV or FASTA): ").strip()
+    output_file = input("Enter output file (.csv or .parquet): ").strip() or "tm_results.csv"
+    na_input = input("Na+ concentration in mol/L (empty = per-oligo column or 0.05): ").strip()
+    conditions = {"na_conc": float(na_input)} if na_input else {}
+
+    started = time.time()
+    batch, _ = process_oligo_file(input_file, output_file, **conditions)
+    print(f"Computed Tm for {len(batch):,} oligos in {time.time() - started:.2f}s")
+    print(f"Results saved to {output_file}")
+
+
+if __name__ == "__main__":
+    main()
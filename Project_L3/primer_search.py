@@ -0,0 +1,69 @@
+# Primer discovery over a whole genome, built on the melting temperature formulas from assign1/assign2.
+# Every oligo in the length range is filtered on Tm, GC%, GC clamp and homopolymer runs,
+# then forward and reverse primers are paired into amplicons within the product size range.
+import csv
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bioutils.fasta import read_fasta_records
+from bioutils.packed import PackedSequence
+from bioutils.primers import REVERSE, find_primers_parallel, pair_primers, primer_sequence, thin_candidates
+
+PRIMER_CRITERIA = {
+    'min_length': 18,
+    'max_length': 25,
+    'tm_range': (52.0, 62.0),
+    'gc_range': (40.0, 60.0),
+    'gc_clamp': True,
+    'max_homopolymer': 4,
+    'method': 'salt',
+}
+PRODUCT_RANGE = (150, 1000)
+MAX_TM_DIFFERENCE = 2.0
+PRIMER_SPACING = 50  # keep the best candidate per strand in every 50 bp before pairing
+
+
+def design_primers(sequence, criteria=PRIMER_CRITERIA, product_range=PRODUCT_RANGE):
+    candidates = find_primers_parallel(sequence, **criteria)
+    target_tm = sum(criteria['tm_range']) / 2
+    pairs = pair_primers(thin_candidates(candidates, PRIMER_SPACING, target_tm), product_range, MAX_TM_DIFFERENCE)
+    return candidates, pairs
+
+
+def write_pairs(record_id, sequence, pairs, writer):
+    for i in range(len(pairs['product_size'])):
+        writer.writerow([
+            record_id,
+            pairs['forward_start'][i] + 1,
+            primer_sequence(sequence, pairs['forward_start'][i], pairs['forward_length'][i], 1),
+            f"{pairs['forward_tm'][i]:.2f}",
+            pairs['reverse_start'][i] + pairs['reverse_length'][i],
+            primer_sequence(sequence, pairs['reverse_start'][i], pairs['reverse_length'][i], REVERSE),
+            f"{pairs['reverse_tm'][i]:.2f}",
+            pairs['product_size'][i],
+        ])
+
+
+def main():
+    fasta_file = input("Enter FASTA filename: ").strip()
+    output_file = os.path.splitext(os.path.basename(fasta_file))[0] + "_primers.csv"
+
+    with open(output_file, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["record", "forward_start", "forward_primer", "forward_tm",
+                         "reverse_end", "reverse_primer", "reverse_tm", "product_size"])
+        for record_id, sequence in read_fasta_records(fasta_file):
+            started = time.time()
+            packed = PackedSequence.from_str(sequence)
+            candidates, pairs = design_primers(packed)
+            write_pairs(record_id, packed, pairs, writer)
+            print(f"{record_id}: {len(sequence):,} bp, {len(candidates['start']):,} candidate primers, "
+                  f"{len(pairs['product_size']):,} primer pairs ({time.time() - started:.2f}s)")
+
+    print(f"Primer pairs saved to {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,11 @@
 # Implement an app that converts the coding region of a gene into an amino acid sequence. Use the genetic code table.
 
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bioutils import translation
+
 CODE_TABLE = {
     'UUU': 'Phe', 'UUC': 'Phe', 'UUA': 'Leu', 'UUG': 'Leu',
     'UCU': 'Ser', 'UCC': 'Ser', 'UCA': 'Ser', 'UCG': 'Ser',
@@ -20,17 +26,9 @@ CODE_TABLE = {
 }
 
 def translate(sequence: str) -> str:
-    result = []
-    sequence = sequence.upper().replace('T', 'U')
-    for i in range(0, len(sequence), 3):
-        code = sequence[i:i+3]
-        if len(code) < 3:
-            break
-        temp = CODE_TABLE.get(code, 'X')
-        if temp == 'Stop':
-            break
-        result.append(temp)
-    return "".join(result)
+    # Lookup-table engine: codon indices are computed in one numpy pass and stop at the first stop codon
+    protein = translation.translate(sequence.strip(), to_stop=True)
+    return translation.to_three_letter(protein)
 
 if __name__ == "__main__":
     test = input("Sequence: ")
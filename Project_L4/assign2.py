@@ -6,40 +6,22 @@
 # d. Show in the output of the console the top 3 aminoacids for each genome.
 
 import collections
+import os
+import sys
 import matplotlib.pyplot as plt
 
-CODON_TABLE = {
-    'UUU': 'Phe', 'UUC': 'Phe', 'UUA': 'Leu', 'UUG': 'Leu',
-    'UCU': 'Ser', 'UCC': 'Ser', 'UCA': 'Ser', 'UCG': 'Ser',
-    'UAU': 'Tyr', 'UAC': 'Tyr', 'UAA': 'Stop', 'UAG': 'Stop',
-    'UGU': 'Cys', 'UGC': 'Cys', 'UGA': 'Stop', 'UGG': 'Trp',
-    'CUU': 'Leu', 'CUC': 'Leu', 'CUA': 'Leu', 'CUG': 'Leu',
-    'CCU': 'Pro', 'CCC': 'Pro', 'CCA': 'Pro', 'CCG': 'Pro',
-    'CAU': 'His', 'CAC': 'His', 'CAA': 'Gln', 'CAG': 'Gln',
-    'CGU': 'Arg', 'CGC': 'Arg', 'CGA': 'Arg', 'CGG': 'Arg',
-    'AUU': 'Ile', 'AUC': 'Ile', 'AUA': 'Ile', 'AUG': 'Met',
-    'ACU': 'Thr', 'ACC': 'Thr', 'ACA': 'Thr', 'ACG': 'Thr',
-    'AAU': 'Asn', 'AAC': 'Asn', 'AAA': 'Lys', 'AAG': 'Lys',
-    'AGU': 'Ser', 'AGC': 'Ser', 'AGA': 'Arg', 'AGG': 'Arg',
-    'GUU': 'Val', 'GUC': 'Val', 'GUA': 'Val', 'GUG': 'Val',
-    'GCU': 'Ala', 'GCC': 'Ala', 'GCA': 'Ala', 'GCG': 'Ala',
-    'GAU': 'Asp', 'GAC': 'Asp', 'GAA': 'Glu', 'GAG': 'Glu',
-    'GGU': 'Gly', 'GGC': 'Gly', 'GGA': 'Gly', 'GGG': 'Gly',
-}
-# -------------------------
-
-def read_fasta(filename: str) -> str:
-    sequence = []
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bioutils.codon_usage import CODONS, amino_acid_usage, record_codon_counts
+from bioutils.fasta import read_fasta_records
+from bioutils.result_cache import ResultCache, file_digest
+from bioutils.translation import THREE_LETTER
+
+def read_fasta(filename: str) -> list:
     try:
-        with open(filename, 'r') as f:
-            for line in f:
-                if not line.startswith('>'):
-                    sequence.append(line.strip())
-        
-        full_sequence = "".join(sequence).upper()
-        if not full_sequence:
+        records = list(read_fasta_records(filename))
+        if not any(sequence for _, sequence in records):
             print(f"Warning: No sequence data found in {filename}.")
-        return full_sequence
+        return records
     
     except FileNotFoundError:
         print(f"Error: File not found at {filename}")
@@ -50,26 +32,31 @@ def read_fasta(filename: str) -> str:
         print(f"An error occurred reading {filename}: {e}")
         exit(1)
 
-def count_codons(genome_sequence: str) -> collections.Counter:
-    rna_sequence = genome_sequence.replace('T', 'U')
-    codon_counts = collections.Counter()
-    
-    for i in range(0, len(rna_sequence) - 2, 3):
-        codon = rna_sequence[i:i+3]
-        
-        if len(codon) == 3:
-            codon_counts[codon] += 1
-            
-    return codon_counts
+def count_codons(records: list) -> collections.Counter:
+    # Per-record 64-bin counts, so codons never run across record boundaries
+    _, counts = record_codon_counts(records)
+    totals = counts.sum(axis=0)
+    return collections.Counter({
+        CODONS[index].replace('T', 'U'): int(count)
+        for index, count in enumerate(totals) if count
+    })
+
+def load_codon_counts(filename: str, cache: ResultCache) -> collections.Counter:
+    # Codon totals only change with the file contents, so reruns skip parsing and counting
+    try:
+        digest = file_digest(filename)
+    except FileNotFoundError:
+        return count_codons(read_fasta(filename))  # read_fasta reports the missing file
+    counts = cache.cached(digest, 'codon_counts', None,
+                          lambda: dict(count_codons(read_fasta(filename))))
+    return collections.Counter(counts)
 
 def calculate_amino_acid_counts(codon_counts: collections.Counter) -> collections.Counter:
-    aa_counts = collections.Counter()
-    for codon, count in codon_counts.items():
-        amino_acid = CODON_TABLE.get(codon)
-        if amino_acid and amino_acid != 'Stop':
-            aa_counts[amino_acid] += count
-            
-    return aa_counts
+    counts = [codon_counts.get(codon.replace('T', 'U'), 0) for codon in CODONS]
+    letters, usage = amino_acid_usage(counts)
+    return collections.Counter({
+        THREE_LETTER[letter]: int(count) for letter, count in zip(letters, usage) if count
+    })
 
 def plot_top_codons(top_10_list: list, title: str, filename: str):
     codons, counts = zip(*top_10_list)
@@ -90,15 +77,14 @@ def plot_top_codons(top_10_list: list, title: str, filename: str):
 def main():
     COVID_FILE = 'covid.fasta'
     FLU_FILE = 'influenza.fasta'
+    cache = ResultCache()
 
     print(f"Processing {COVID_FILE}...")
-    covid_seq = read_fasta(COVID_FILE)
-    covid_codons = count_codons(covid_seq)
+    covid_codons = load_codon_counts(COVID_FILE, cache)
     covid_top_10 = covid_codons.most_common(10)
 
     print(f"Processing {FLU_FILE}...")
-    flu_seq = read_fasta(FLU_FILE)
-    flu_codons = count_codons(flu_seq)
+    flu_codons = load_codon_counts(FLU_FILE, cache)
     flu_top_10 = flu_codons.most_common(10)
 
     print("\na) Generating chart for COVID-19...")
@@ -145,5 +131,7 @@ def main():
     for aa, count in flu_aa_counts.most_common(3):
         print(f"  1. {aa}: {count} occurrences")
 
+    print("\n" + cache.summary())
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,68 @@
+# Extension of assign2 from two hard-coded genomes to a whole collection:
+# codon usage is computed for every FASTA file in a directory (one genome per worker process),
+# assembled into a genomes x 64 frequency matrix, compared pairwise and clustered hierarchically.
+import csv
+import os
+import sys
+import time
+
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy.cluster.hierarchy import dendrogram, linkage
+from scipy.spatial.distance import squareform
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bioutils.codon_usage import (CODONS, codon_frequencies, codon_usage_matrix, find_fasta_files,
+                                  pairwise_distances)
+
+DISTANCE_METRIC = 'euclidean'
+LINKAGE_METHOD = 'average'
+
+
+def save_matrix(filename, names, counts, frequencies, distances, tree):
+    np.savez_compressed(filename, genomes=np.array(names), codons=np.array(CODONS), counts=counts,
+                        frequencies=frequencies, distances=distances, linkage=tree)
+    with open(os.path.splitext(filename)[0] + ".csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["genome"] + [codon.replace('T', 'U') for codon in CODONS])
+        for name, row in zip(names, frequencies):
+            writer.writerow([name] + [f"{value:.6f}" for value in row])
+
+
+def plot_dendrogram(names, tree, filename):
+    plt.figure(figsize=(12, max(6, len(names) * 0.2)))
+    dendrogram(tree, labels=names, orientation='left')
+    plt.title("Genomes clustered by codon usage", fontsize=14)
+    plt.xlabel(f"{DISTANCE_METRIC.capitalize()} distance")
+    plt.tight_layout()
+    plt.savefig(filename)
+    print(f"Dendrogram saved as '{filename}'")
+
+
+def main():
+    directory = input("Enter directory with genome FASTA files: ").strip() or "."
+    files = find_fasta_files(directory)
+    if len(files) < 2:
+        print("At least two FASTA files are needed for a comparison.")
+        return
+
+    started = time.time()
+    names = [os.path.basename(path) for path in files]
+    counts = codon_usage_matrix(files)
+    frequencies = codon_frequencies(counts)
+    distances = pairwise_distances(frequencies, DISTANCE_METRIC)
+    tree = linkage(squareform(distances, checks=False), method=LINKAGE_METHOD)
+    print(f"Processed {len(files)} genomes in {time.time() - started:.2f}s")
+
+    save_matrix("codon_usage_matrix.npz", names, counts, frequencies, distances, tree)
+    print("Matrix saved as 'codon_usage_matrix.npz' and 'codon_usage_matrix.csv'")
+    plot_dendrogram(names, tree, "codon_usage_dendrogram.png")
+
+    closest = np.where(np.eye(len(names), dtype=bool), np.inf, distances).argmin(axis=1)
+    print("\nClosest genome by codon usage:")
+    for i, name in enumerate(names):
+        print(f"  {name} -> {names[closest[i]]} ({distances[i, closest[i]]:.4f})")
+
+
+if __name__ == "__main__":
+    main()
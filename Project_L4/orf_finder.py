@@ -0,0 +1,36 @@
+# Six-frame ORF finder built on the translation engine behind assign1.
+# Unlike assign1 it does not assume the input starts at the coding region: every ATG...stop
+# on both strands above the minimum length is reported with its coordinates and protein.
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bioutils.orfs import find_orfs_in_file, write_orfs
+
+MIN_PROTEIN_LENGTH = 100
+GENETIC_CODE = 11
+
+
+def main():
+    fasta_file = input("Enter FASTA filename: ").strip()
+    base_name = os.path.splitext(os.path.basename(fasta_file))[0]
+    table_path = f"{base_name}_orfs.tsv"
+    protein_path = f"{base_name}_orfs.faa"
+
+    started = time.time()
+    total = 0
+    with open(table_path, "w") as table_file, open(protein_path, "w") as protein_file:
+        table_file.write("orf\trecord\tstart\tend\tstrand\tframe\tlength_aa\n")
+        for record_id, orfs, proteins in find_orfs_in_file(fasta_file, min_length=MIN_PROTEIN_LENGTH,
+                                                           table_id=GENETIC_CODE):
+            write_orfs(record_id, orfs, proteins, table_file, protein_file)
+            total += len(proteins)
+            print(f"{record_id}: {len(proteins)} ORFs")
+
+    print(f"\n{total} ORFs found in {time.time() - started:.2f}s")
+    print(f"Coordinates saved to {table_path}, proteins to {protein_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# Peptide search over six-frame translated genomes, building on the translation from assign1.
+# The translated proteome is indexed once (and saved next to the first FASTA file),
+# then every query returns nucleotide coordinates without translating the genomes again.
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bioutils.peptide_index import DEFAULT_SEED, PeptideIndex
+
+GENETIC_CODE = 1
+
+
+def load_index(fasta_files, table_id=GENETIC_CODE, seed_length=DEFAULT_SEED):
+    # A saved index is reused only if it is newer than the FASTA and was built with the same
+    # genetic code and seed length
+    index_path = fasta_files[0] + ".pepidx.npz"
+    newest_input = max(os.path.getmtime(path) for path in fasta_files)
+    if len(fasta_files) == 1 and os.path.exists(index_path) and os.path.getmtime(index_path) >= newest_input:
+        index = PeptideIndex.load(index_path)
+        if index.table_id == table_id and index.seed_length == seed_length:
+            return index
+    index = PeptideIndex.from_fasta(fasta_files, table_id, seed_length)
+    if len(fasta_files) == 1:
+        index.save(index_path)
+    return index
+
+
+def main():
+    fasta_files = input("Enter FASTA files (comma separated): ").strip().split(",")
+    fasta_files = [path.strip() for path in fasta_files if path.strip()]
+    if not fasta_files:
+        print("No files provided. Exiting.")
+        return
+
+    table_id = input(f"Genetic code table [{GENETIC_CODE}]: ").strip()
+    table_id = int(table_id) if table_id else GENETIC_CODE
+
+    started = time.time()
+    index = load_index(fasta_files, table_id)
+    print(f"Indexed {len(index.text):,} translated residues in {time.time() - started:.2f}s")
+
+    while True:
+        query = input("\nPeptide (empty to quit): ").strip()
+        if not query:
+            break
+        substitutions = input("Max substitutions [0]: ").strip()
+        substitutions = int(substitutions) if substitutions else 0
+
+        started = time.time()
+        hits = index.search(query, substitutions)
+        print(f"{len(hits)} hit(s) in {(time.time() - started) * 1000:.1f} ms")
+        for hit in hits:
+            strand = '+' if hit['strand'] == 1 else '-'
+            print(f"  {hit['record']}:{hit['start'] + 1}-{hit['end']} ({strand}{hit['frame']}) "
+                  f"{hit['peptide']} [{hit['substitutions']} substitution(s)]")
+
+
+if __name__ == "__main__":
+    main()
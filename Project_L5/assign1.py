@@ -1,4 +1,18 @@
+import os
 import random
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bioutils.debruijn import assemble_debruijn, write_contigs
+from bioutils.minimizer_overlap import approximate_overlap_graph, edit_distance
+from bioutils.overlap_graph import build_overlap_graph, greedy_contigs
+from bioutils.overlap_index import greedy_assemble
+from bioutils.read_sim import ErrorModel, simulate_reads
+
+MODES = ('greedy', 'graph', 'debruijn', 'approx')
+CONTIGS_FILE = 'contigs.fasta'
+# Sequencing errors simulated in 'approx' mode
+NOISY_READS = ErrorModel(substitution=0.01, insertion=0.002, deletion=0.002)
 
 def get_sequence_data():
     original_sequence = (
@@ -20,20 +34,10 @@ def get_sequence_data():
     )
     return original_sequence
 
-def sample_sequence(sequence, num_samples=2000, min_len=100, max_len=150):
-    samples = []
-    seq_len = len(sequence)
-    for _ in range(num_samples):
-        sample_length = random.randint(min_len, max_len)
-        max_start_index = seq_len - sample_length
-        if max_start_index < 0:
-            start_index = 0
-            sample_length = seq_len
-        else:
-            start_index = random.randint(0, max_start_index)
-        sample = sequence[start_index : start_index + sample_length]
-        samples.append(sample)
-    return samples
+def sample_sequence(sequence, num_samples=2000, min_len=100, max_len=150, errors=ErrorModel()):
+    # Start positions and lengths are drawn in numpy batches; reads longer than the sequence are clipped to it
+    return [read for batch in simulate_reads(sequence, num_samples, min_len, max_len, errors)
+            for read in batch.sequences()]
 
 def find_best_suffix_overlap(assembly, fragment, min_overlap=30):
     best_k = 0
@@ -55,56 +59,65 @@ def assemble_sequence(samples, min_overlap=30):
     if not samples:
         return ""
         
-    remaining_samples = list(samples)
-    assembly = remaining_samples.pop(0)
-    print(f"Starting assembly with a {len(assembly)}bp fragment.")
-    while True:
-        best_overlap_len = 0
-        best_match_index = -1
-        
-        for i, sample in enumerate(remaining_samples):
-            overlap_len = find_best_suffix_overlap(assembly, sample, min_overlap)
-            if overlap_len > best_overlap_len:
-                best_overlap_len = overlap_len
-                best_match_index = i
-        
-        if best_match_index != -1:
-            best_sample = remaining_samples.pop(best_match_index)
-            assembly += best_sample[best_overlap_len:]
-        else:
-            break
-            
-    print(f"Suffix extension complete. Assembly is now {len(assembly)}bp.")
+    print(f"Starting assembly with a {len(samples[0])}bp fragment.")
+    # Seed-indexed overlaps pick the same fragment as scanning every sample with the functions above
+    assembly, suffix_length, unused = greedy_assemble(samples, min_overlap)
+    print(f"Suffix extension complete. Assembly is now {suffix_length}bp.")
+    print(f"Prefix extension complete. Final assembly length: {len(assembly)}bp.")
+    print(f"{unused} samples were unused.")
+    return assembly
 
-    while True:
-        best_overlap_len = 0
-        best_match_index = -1
+def assemble_from_overlap_graph(samples, min_overlap=30):
+    # All suffix-prefix overlaps come from one suffix array, then the longest are joined greedily
+    graph = build_overlap_graph(samples, min_overlap)
+    print(f"Overlap graph: {len(graph.reads)} distinct reads, {int(graph.contained.sum())} contained, "
+          f"{len(graph.sources)} overlaps >= {min_overlap}bp.")
+    contigs = greedy_contigs(graph)
+    print(f"Greedy layout produced {len(contigs)} contig(s).")
+    return contigs[0] if contigs else ""
 
-        for i, sample in enumerate(remaining_samples):
-            overlap_len = find_best_prefix_overlap(assembly, sample, min_overlap)
-            if overlap_len > best_overlap_len:
-                best_overlap_len = overlap_len
-                best_match_index = i
-        
-        if best_match_index != -1:
-            best_sample = remaining_samples.pop(best_match_index)
-            assembly = best_sample[:-best_overlap_len] + assembly
-        else:
-            break
+def assemble_approximate(samples, min_overlap=30, max_error_rate=0.12):
+    # Exact overlaps break at every sequencing error; here minimizer hits nominate read pairs and a
+    # banded edit distance accepts overlaps with up to max_error_rate edits per base
+    graph = approximate_overlap_graph(samples, min_overlap, max_error_rate)
+    print(f"Approximate overlap graph: {len(graph.reads)} distinct reads, {int(graph.contained.sum())} contained, "
+          f"{len(graph.sources)} overlaps >= {min_overlap}bp within {max_error_rate:.0%} error.")
+    contigs = greedy_contigs(graph)
+    print(f"Greedy layout produced {len(contigs)} contig(s).")
+    return contigs[0] if contigs else ""
 
-    print(f"Prefix extension complete. Final assembly length: {len(assembly)}bp.")
-    print(f"{len(remaining_samples)} samples were unused.")
-    return assembly
+def assemble_de_bruijn(samples, k=31, min_count=None):
+    # Solid k-mers (above the error valley of the count histogram) form the graph; weakly covered
+    # tips and bubbles are removed before compaction. The samples all come from the forward strand,
+    # so the graph is built from it alone and contigs come out in the original orientation
+    contigs = assemble_debruijn(samples, k, min_count, both_strands=False)
+    with open(CONTIGS_FILE, 'w') as f:
+        write_contigs(f, contigs)
+    print(f"De Bruijn graph (k={k}) produced {len(contigs)} contig(s), saved to '{CONTIGS_FILE}'.")
+    return contigs[0][0] if contigs else ""
 
 def main():
+    mode = sys.argv[1] if len(sys.argv) > 1 else 'greedy'
+    if mode not in MODES:
+        print(f"Unknown mode '{mode}'. Choose one of: {', '.join(MODES)}")
+        return
     original_sequence = get_sequence_data()
     print(f"Original sequence length: {len(original_sequence)}bp")
-    samples = sample_sequence(original_sequence, num_samples=2000, min_len=100, max_len=150)
+    errors = NOISY_READS if mode == 'approx' else ErrorModel()
+    samples = sample_sequence(original_sequence, num_samples=2000, min_len=100, max_len=150, errors=errors)
     print(f"Generated {len(samples)} samples.")
     
     random.shuffle(samples) 
     
-    final_assembly = assemble_sequence(samples, min_overlap=30)
+    if mode == 'graph':
+        final_assembly = assemble_from_overlap_graph(samples, min_overlap=30)
+    elif mode == 'debruijn':
+        # The samples are error-free, so a k-mer seen once is genuine and keeps the sequence ends
+        final_assembly = assemble_de_bruijn(samples, k=31, min_count=1)
+    elif mode == 'approx':
+        final_assembly = assemble_approximate(samples, min_overlap=30)
+    else:
+        final_assembly = assemble_sequence(samples, min_overlap=30)
     
     print("\n--- Assembly Results ---")
     print(f"Original Length:  {len(original_sequence)}")
@@ -116,6 +129,10 @@ def main():
         print("Verification: PARTIAL. Assembly is a perfect substring of the original (likely missed ends).")
     elif original_sequence in final_assembly:
         print("Verification: PARTIAL. Original is a perfect substring of the assembly (over-assembled).")
+    elif mode == 'approx':
+        # Uncorrected read errors remain in the contig, so report how far it is from the original
+        print(f"Verification: {edit_distance(final_assembly, original_sequence)} edit(s) from the original "
+              f"(reads carry about {sum(errors):.1%} errors per base).")
     else:
         print("Verification: FAILED. Assembly does not match original.")
 
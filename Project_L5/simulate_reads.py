@@ -0,0 +1,56 @@
+# Simulate sequencing reads from a FASTA genome for load-testing the assemblers in assign1.
+# Reads are generated and written in chunks, so tens of millions of reads never sit in memory at once.
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bioutils.fasta import read_first_record
+from bioutils.read_sim import ErrorModel, simulate_fastq
+
+
+def ask(prompt, default, cast=str):
+    answer = input(f"{prompt} [{default}]: ").strip()
+    return cast(answer) if answer else default
+
+
+def main():
+    fasta_file = input("Enter genome FASTA file: ").strip()
+    if not os.path.exists(fasta_file):
+        print(f"Error: File '{fasta_file}' not found!")
+        return
+    record_id, genome = read_first_record(fasta_file)
+    print(f"Loaded {record_id}: {len(genome):,} bp")
+
+    paired = ask("Paired-end reads? (y/n)", "n").lower() == "y"
+    num_reads = ask("Number of reads (pairs when paired)", 1_000_000, int)
+    errors = ErrorModel(
+        substitution=ask("Substitution rate", 0.001, float),
+        insertion=ask("Insertion rate", 0.0001, float),
+        deletion=ask("Deletion rate", 0.0001, float),
+    )
+
+    started = time.time()
+    if paired:
+        options = {
+            'read_length': ask("Read length", 150, int),
+            'insert_mean': ask("Mean insert size", 400, float),
+            'insert_sd': ask("Insert size standard deviation", 50, float),
+        }
+        written = simulate_fastq(genome, "reads_1.fastq", num_reads, "reads_2.fastq", errors, **options)
+        outputs = "reads_1.fastq and reads_2.fastq"
+    else:
+        options = {
+            'min_len': ask("Minimum read length", 100, int),
+            'max_len': ask("Maximum read length", 150, int),
+            'both_strands': ask("Sample both strands? (y/n)", "y").lower() == "y",
+        }
+        written = simulate_fastq(genome, "reads.fastq", num_reads, None, errors, **options)
+        outputs = "reads.fastq"
+
+    elapsed = time.time() - started
+    print(f"Wrote {written:,} {'pairs' if paired else 'reads'} to {outputs} in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,13 @@
 # 1. Take an arbitrary DNA sequence from the NCBI (National Center for Biotechnology), between 1000 and 3000 nucleotides (letters).
 # 2. Implement a software application that detects repetitions (between 6b and 10b) in this DNA sequence.
 # 3. Plot the frequencies of the repetitions found.
+import os
+import sys
 import matplotlib.pyplot as plt
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bioutils.result_cache import ResultCache, content_digest
+
 def find_repetitions(dna_sequence, min_length=6, max_length=10):
     all_repetitions = {}
     sequence_upper = dna_sequence.upper()
@@ -64,7 +69,9 @@ def main():
     print(f"\nSequence length: {len(dna_sequence)} nucleotides")
     print("\nSearching for repetitions...")
     
-    repetitions = find_repetitions(dna_sequence)
+    cache = ResultCache()
+    repetitions = cache.cached(content_digest(dna_sequence), 'repetitions', {'min_length': 6, 'max_length': 10},
+                               lambda: find_repetitions(dna_sequence))
     
     print(f"\nFound {len(repetitions)} repeated patterns\n")
 
@@ -77,6 +84,7 @@ def main():
     print("\nGenerating frequency plot...")
     plot_repetition_frequencies(repetitions)
     
+    print("\n" + cache.summary())
     print("\nDone!")
 
 if __name__ == "__main__":
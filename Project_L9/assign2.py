@@ -3,14 +3,17 @@
 # The inverted repeat should have 4 minimum length of 4 letters and a maximum of 6 letters.
 # 4.⁠ ⁠Make a raport about the results from exercise 3 write the raport in a txt or docx file. Upload this raport on moodle.
 
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bioutils.fasta import read_fasta_records
+from bioutils.result_cache import ResultCache, file_digest
+
+REPEAT_PARAMS = {'min_len': 4, 'max_len': 6, 'max_spacer': 100}
+
 def read_fasta(filename):
-    sequence = ""
-    with open(filename, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line.startswith('>'):  
-                sequence += line.upper()
-    return sequence
+    return [(record_id, sequence.decode('ascii')) for record_id, sequence in read_fasta_records(filename)]
 
 def reverse_complement(seq):
     complement = {'A': 'T', 'T': 'A', 'G': 'C', 'C': 'G', 'N': 'N'}
@@ -65,14 +68,31 @@ def filter_repeats(repeats, max_results=50):
     
     return sorted(filtered, key=lambda x: x['left_pos'])
 
-def analyze_genome(filename):
+def find_genome_repeats(records):
+    repeats = []
+    offset = 0
+    for record_id, sequence in records:
+        for repeat in find_inverted_repeats(sequence, **REPEAT_PARAMS):
+            repeat['record'] = record_id
+            repeat['left_pos'] += offset
+            repeat['right_pos'] += offset
+            repeats.append(repeat)
+        offset += len(sequence)
+    return repeats
+
+def analyze_genome(filename, cache=None):
     print(f"\nAnalyzing: {filename}")
     
-    sequence = read_fasta(filename)
-    print(f"  Genome length: {len(sequence):,} bp")
+    records = read_fasta(filename)
+    genome_length = sum(len(sequence) for _, sequence in records)
+    print(f"  Genome length: {genome_length:,} bp in {len(records)} record(s)")
     
     print(f"  Searching for inverted repeats...")
-    repeats = find_inverted_repeats(sequence)
+    if cache is None:
+        repeats = find_genome_repeats(records)
+    else:
+        repeats = cache.cached(file_digest(filename), 'inverted_repeats', REPEAT_PARAMS,
+                               lambda: find_genome_repeats(records))
     print(f"  Found {len(repeats)} total inverted repeats")
     
     filtered = filter_repeats(repeats)
@@ -84,7 +104,7 @@ def analyze_genome(filename):
     
     return {
         'filename': filename,
-        'length': len(sequence),
+        'length': genome_length,
         'total_repeats': len(repeats),
         'filtered_repeats': filtered,
         'counts': counts
@@ -155,10 +175,11 @@ def main():
     
     print(f"\n{len(fasta_files)} genome(s) will be analyzed")
     
+    cache = ResultCache()
     results = []
     for fasta_file in fasta_files:
         try:
-            result = analyze_genome(fasta_file)
+            result = analyze_genome(fasta_file, cache)
             results.append(result)
         except FileNotFoundError:
             print(f"  ERROR: File not found: {fasta_file}")
@@ -170,6 +191,7 @@ def main():
         return
     
     generate_report(results)
+    print("  " + cache.summary())
     
     print("\n" + "="*80)
     print("ANALYSIS COMPLETE!")
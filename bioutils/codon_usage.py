@@ -0,0 +1,123 @@
+import os
+from multiprocessing import Pool, cpu_count
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+from bioutils.fasta import read_fasta_records
+from bioutils.kmers import decode_kmer
+from bioutils.translation import STOP, UNKNOWN_CODON, codon_indices, codon_table
+from bioutils.windows import SequenceLike
+
+CODONS = [decode_kmer(index, 3) for index in range(64)]
+
+
+def codon_counts(sequence: SequenceLike, frame: int = 0) -> np.ndarray:
+    indices = codon_indices(sequence, frame)
+    return np.bincount(indices[indices != UNKNOWN_CODON], minlength=64)
+
+
+def record_codon_counts(records: Iterable[Tuple[str, SequenceLike]]) -> Tuple[List[str], np.ndarray]:
+    # One 64-bin row per record (gene / CDS), so codons never span record boundaries
+    names = []
+    rows = []
+    for name, sequence in records:
+        names.append(name)
+        rows.append(codon_counts(sequence))
+    matrix = np.vstack(rows) if rows else np.zeros((0, 64), dtype=np.int64)
+    return names, matrix
+
+
+def amino_acid_groups(table_id: int = 1) -> Tuple[str, np.ndarray]:
+    # Amino acid letters (stops excluded) and a (64, n_amino_acids) codon membership matrix
+    table = codon_table(table_id)[:64]
+    letters = ''.join(sorted(set(table.tobytes().decode('ascii')) - {chr(STOP)}))
+    membership = (table[:, None] == np.frombuffer(letters.encode('ascii'), dtype=np.uint8)[None, :])
+    return letters, membership.astype(np.int64)
+
+
+def amino_acid_usage(counts: np.ndarray, table_id: int = 1) -> Tuple[str, np.ndarray]:
+    # Works on one 64-vector or a (records, 64) matrix
+    letters, membership = amino_acid_groups(table_id)
+    return letters, counts @ membership
+
+
+def rscu(counts: np.ndarray, table_id: int = 1) -> np.ndarray:
+    # Relative synonymous codon usage: observed / mean count of the amino acid's codons.
+    # Stop codons and amino acids that were never seen get NaN.
+    _, membership = amino_acid_groups(table_id)
+    counts = np.asarray(counts, dtype=np.float64)
+    synonyms = membership.sum(axis=0)
+    mean_per_amino_acid = (counts @ membership) / synonyms
+    expected = mean_per_amino_acid @ membership.T
+    is_stop = membership.sum(axis=1) == 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = counts / expected
+    return np.where(is_stop | (expected == 0), np.nan, values)
+
+
+def relative_adaptiveness(reference_counts: np.ndarray, table_id: int = 1, pseudocount: float = 0.5) -> np.ndarray:
+    # w = RSCU / max RSCU of the same amino acid, from a reference set of highly expressed genes
+    _, membership = amino_acid_groups(table_id)
+    values = rscu(np.asarray(reference_counts, dtype=np.float64) + pseudocount, table_id)
+    best = np.nanmax(np.where(membership.astype(bool), values[:, None], np.nan), axis=0)
+    return values / (best @ membership.T)
+
+
+def cai(counts: np.ndarray, weights: np.ndarray, table_id: int = 1) -> np.ndarray:
+    # Codon adaptation index: geometric mean of w over the codons used
+    # Amino acids with a single codon in this table carry no usage bias and are left out (Sharp & Li, 1987)
+    _, membership = amino_acid_groups(table_id)
+    single_codon = membership.sum(axis=0) == 1
+    informative = ~np.isnan(weights) & ~(membership[:, single_codon] > 0).any(axis=1)
+    log_weights = np.where(informative, np.log(np.where(informative, weights, 1.0)), 0.0)
+    counts = np.asarray(counts, dtype=np.float64) * informative
+    total = counts.sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.exp((counts @ log_weights) / total)
+
+
+FASTA_EXTENSIONS = ('.fasta', '.fa', '.fna', '.ffn', '.fasta.gz', '.fa.gz', '.fna.gz', '.ffn.gz')
+
+
+def find_fasta_files(directory: str) -> List[str]:
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(FASTA_EXTENSIONS)
+    )
+
+
+def genome_codon_counts(filename: str) -> np.ndarray:
+    # Summed per-record counts for one genome file
+    _, counts = record_codon_counts(read_fasta_records(filename))
+    return counts.sum(axis=0)
+
+
+def codon_usage_matrix(filenames: List[str], processes: int = None) -> np.ndarray:
+    # genomes x 64 count matrix, one genome per worker task
+    if not filenames:
+        return np.zeros((0, 64), dtype=np.int64)
+    with Pool(processes or cpu_count()) as pool:
+        return np.vstack(pool.map(genome_codon_counts, filenames))
+
+
+def codon_frequencies(counts: np.ndarray) -> np.ndarray:
+    totals = counts.sum(axis=-1, keepdims=True)
+    return np.divide(counts, totals, out=np.zeros(counts.shape), where=totals > 0)
+
+
+def pairwise_distances(frequencies: np.ndarray, metric: str = 'euclidean') -> np.ndarray:
+    # Full distance matrix from one Gram product instead of a Python double loop
+    if metric == 'euclidean':
+        squared = (frequencies ** 2).sum(axis=1)
+        distances = squared[:, None] + squared[None, :] - 2 * frequencies @ frequencies.T
+        distances = np.sqrt(np.maximum(distances, 0))
+    elif metric == 'cosine':
+        norms = np.linalg.norm(frequencies, axis=1)
+        norms[norms == 0] = 1
+        unit = frequencies / norms[:, None]
+        distances = np.maximum(1 - unit @ unit.T, 0)
+    else:
+        raise ValueError(f"Unsupported metric: {metric}")
+    np.fill_diagonal(distances, 0)
+    return distances
@@ -0,0 +1,290 @@
+from typing import Iterable, Iterator, List, NamedTuple, Sequence, TextIO, Tuple
+
+import numpy as np
+
+from bioutils.kmers import (MAX_K, canonical_codes, count_codes, kmer_codes, merge_count_tables,
+                            reverse_complement_codes)
+from bioutils.packed import DECODE_TABLE
+
+DEFAULT_K = 31
+BATCH_READS = 100_000
+MAX_CLEANING_ROUNDS = 10
+DEFAULT_MIN_COUNT = 2
+MAX_HISTOGRAM_COUNT = 100_000
+# A tip or bubble branch is only dropped when its sibling is at least this many times better covered
+COVERAGE_RATIO = 4
+
+
+class Unitigs(NamedTuple):
+    nodes: np.ndarray       # node indices, unitig by unitig, in path order
+    starts: np.ndarray      # offset of each unitig in `nodes`
+    lengths: np.ndarray     # number of k-mers in each unitig
+    coverage: np.ndarray    # mean k-mer count of each unitig
+
+
+def _batches(reads: Iterable[str], size: int) -> Iterator[List[str]]:
+    batch = []
+    for read in reads:
+        batch.append(read)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def count_read_kmers(reads: Iterable[str], k: int = DEFAULT_K, both_strands: bool = True,
+                     batch_reads: int = BATCH_READS) -> Tuple[np.ndarray, np.ndarray]:
+    # Reads are joined with N so no k-mer spans two reads; each batch is counted and merged,
+    # keeping memory proportional to the distinct k-mers rather than the read set.
+    # The reverse strand is added once, from the distinct table.
+    table = (np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.uint64))
+    for batch in _batches(reads, batch_reads):
+        codes, _ = kmer_codes("N".join(batch), k)
+        table = merge_count_tables([table, count_codes(codes, k)])
+    if both_strands:
+        codes, counts = table
+        table = merge_count_tables([table, (reverse_complement_codes(codes, k), counts)])
+    return table
+
+
+def solid_threshold(counts: np.ndarray) -> int:
+    # Error k-mers make up the falling left flank of the count histogram and genomic k-mers a peak
+    # near the k-mer coverage; the first valley between the two is the smallest solid count
+    if not len(counts):
+        return DEFAULT_MIN_COUNT
+    histogram = np.bincount(np.minimum(counts, MAX_HISTOGRAM_COUNT).astype(np.int64))
+    rising = np.flatnonzero(histogram[2:] >= histogram[1:-1]) + 1
+    if not len(rising):
+        return DEFAULT_MIN_COUNT
+    return max(int(rising[0]), DEFAULT_MIN_COUNT)
+
+
+class DeBruijnGraph:
+    # Nodes are the sorted k-mer codes; edges are implied by (k - 1)-base overlaps and found by binary search
+    def __init__(self, codes: np.ndarray, counts: np.ndarray, k: int):
+        if not 2 <= k <= MAX_K:
+            raise ValueError(f"k must be between 2 and {MAX_K}")
+        self.codes = np.asarray(codes, dtype=np.uint64)
+        self.counts = np.asarray(counts, dtype=np.uint64)
+        self.k = k
+        self.alive = np.ones(len(self.codes), dtype=bool)
+        self.successors = self._neighbours(forward=True)
+        self.predecessors = self._neighbours(forward=False)
+
+    @classmethod
+    def from_reads(cls, reads: Iterable[str], k: int = DEFAULT_K, min_count: int = None,
+                   both_strands: bool = True) -> 'DeBruijnGraph':
+        # Without min_count, the threshold is read off the k-mer count histogram
+        codes, counts = count_read_kmers(reads, k, both_strands)
+        solid = counts >= (min_count or solid_threshold(counts))
+        return cls(codes[solid], counts[solid], k)
+
+    def _lookup(self, codes: np.ndarray) -> np.ndarray:
+        if not len(self.codes):
+            return np.full(codes.shape, -1, dtype=np.int64)
+        found = np.minimum(np.searchsorted(self.codes, codes), len(self.codes) - 1)
+        return np.where(self.codes[found] == codes, found, -1)
+
+    def _neighbours(self, forward: bool) -> np.ndarray:
+        # (nodes x 4) table of neighbour indices, -1 where the k-mer is absent
+        mask = np.uint64((1 << (2 * self.k)) - 1)
+        neighbours = np.empty((len(self.codes), 4), dtype=np.int64)
+        for base in range(4):
+            if forward:
+                candidates = ((self.codes << np.uint64(2)) | np.uint64(base)) & mask
+            else:
+                candidates = (self.codes >> np.uint64(2)) | np.uint64(base << (2 * (self.k - 1)))
+            neighbours[:, base] = self._lookup(candidates)
+        return neighbours
+
+    def live_neighbours(self, forward: bool = True) -> np.ndarray:
+        neighbours = self.successors if forward else self.predecessors
+        live = neighbours >= 0
+        live[live] = self.alive[neighbours[live]]
+        return np.where(live, neighbours, -1)
+
+    def unitigs(self) -> Unitigs:
+        # Nodes joined by a one-out/one-in link form a chain; chains are ranked by pointer jumping
+        successors = self.live_neighbours(forward=True)
+        predecessors = self.live_neighbours(forward=False)
+        out_degree = (successors >= 0).sum(axis=1)
+        in_degree = (predecessors >= 0).sum(axis=1)
+        following = np.where(out_degree == 1, successors.max(axis=1), -1)
+        following[following >= 0] = np.where(in_degree[following[following >= 0]] == 1,
+                                             following[following >= 0], -1)
+        following[~self.alive] = -1
+        head, offset = _rank_chains(following, self.alive)
+
+        nodes = np.flatnonzero(self.alive)
+        order = np.lexsort((offset[nodes], head[nodes]))
+        nodes = nodes[order]
+        heads = head[nodes]
+        starts = np.flatnonzero(np.concatenate(([True], heads[1:] != heads[:-1]))) if len(nodes) else np.zeros(0, np.int64)
+        lengths = np.diff(np.concatenate((starts, [len(nodes)])))
+        coverage = (np.add.reduceat(self.counts[nodes].astype(np.float64), starts) / lengths
+                    if len(nodes) else np.zeros(0))
+        return Unitigs(nodes, starts, lengths, coverage)
+
+    def spell(self, unitigs: Unitigs) -> List[str]:
+        # First k-mer in full, then the last base of every following k-mer
+        k = self.k
+        firsts = self.codes[unitigs.nodes[unitigs.starts]]
+        shifts = np.uint64(2) * np.arange(k - 1, -1, -1, dtype=np.uint64)
+        head_bases = ((firsts[:, None] >> shifts) & np.uint64(3)).astype(np.uint8)
+        tail_bases = (self.codes[unitigs.nodes] & np.uint64(3)).astype(np.uint8)
+        sizes = unitigs.lengths + k - 1
+        out_starts = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.int64)
+        letters = np.empty(int(sizes.sum()), dtype=np.uint8)
+        letters[(out_starts[:, None] + np.arange(k)).ravel()] = DECODE_TABLE[head_bases].ravel()
+        offsets = np.arange(len(unitigs.nodes)) - np.repeat(unitigs.starts, unitigs.lengths)
+        rest = offsets > 0
+        positions = np.repeat(out_starts, unitigs.lengths) + k - 1 + offsets
+        letters[positions[rest]] = DECODE_TABLE[tail_bases[rest]]
+        text = letters.tobytes().decode('ascii')
+        return [text[start:start + size] for start, size in zip(out_starts.tolist(), sizes.tolist())]
+
+    def _ends(self, unitigs: Unitigs) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        firsts = unitigs.nodes[unitigs.starts]
+        lasts = unitigs.nodes[unitigs.starts + unitigs.lengths - 1]
+        predecessors = self.live_neighbours(forward=False)[firsts]
+        successors = self.live_neighbours(forward=True)[lasts]
+        return firsts, lasts, predecessors, successors
+
+    def _node_coverage(self, unitigs: Unitigs) -> np.ndarray:
+        coverage = np.zeros(len(self.codes))
+        coverage[unitigs.nodes] = np.repeat(unitigs.coverage, unitigs.lengths)
+        return coverage
+
+    def _strongest_sibling(self, ends: np.ndarray, forks: np.ndarray, forward: bool,
+                           node_coverage: np.ndarray) -> np.ndarray:
+        # Best covered other branch leaving each of a unitig's fork nodes (0 where there is none),
+        # taken at the fork where it is weakest
+        siblings = self.live_neighbours(forward)[np.maximum(forks, 0)]
+        valid = (forks >= 0)[:, :, None] & (siblings >= 0) & (siblings != ends[:, None, None])
+        strongest = np.where(valid, node_coverage[siblings], 0).max(axis=2)
+        return np.where(forks >= 0, strongest, np.inf).min(axis=1)
+
+    def remove_tips(self, unitigs: Unitigs, max_length: int) -> int:
+        # Short branches leaving a fork whose best other branch is COVERAGE_RATIO times better covered
+        # are sequencing errors, whether they dead-end or run on into more error k-mers. The best
+        # branch at every fork is never weak, so the graph stays connected although all go at once.
+        firsts, lasts, predecessors, successors = self._ends(unitigs)
+        has_in = (predecessors >= 0).any(axis=1)
+        has_out = (successors >= 0).any(axis=1)
+        node_coverage = self._node_coverage(unitigs)
+        scaled = unitigs.coverage * COVERAGE_RATIO
+        weak_before = has_in & (scaled <= self._strongest_sibling(firsts, predecessors, True, node_coverage))
+        weak_after = has_out & (scaled <= self._strongest_sibling(lasts, successors, False, node_coverage))
+        return self._remove(unitigs, (unitigs.lengths < max_length) & (weak_before | weak_after))
+
+    def remove_bubbles(self, unitigs: Unitigs, max_length: int) -> int:
+        # Unitigs sharing both their single entry and single exit node are alternative paths; the
+        # best covered one is kept (ties broken by smallest canonical k-mer, so both strands agree)
+        # and the others dropped if it is COVERAGE_RATIO times better covered than them
+        _, _, predecessors, successors = self._ends(unitigs)
+        single_in = (predecessors >= 0).sum(axis=1) == 1
+        single_out = (successors >= 0).sum(axis=1) == 1
+        entry = np.where(single_in, predecessors.max(axis=1), -1)
+        exit_ = np.where(single_out, successors.max(axis=1), -1)
+        candidates = np.flatnonzero((entry >= 0) & (exit_ >= 0) & (unitigs.lengths <= max_length))
+        if len(candidates) < 2:
+            return 0
+        smallest = self.smallest_canonical(unitigs)
+        order = np.lexsort((smallest[candidates], -unitigs.coverage[candidates],
+                            exit_[candidates], entry[candidates]))
+        ranked = candidates[order]
+        same = np.concatenate(([False], (entry[ranked][1:] == entry[ranked][:-1]) &
+                               (exit_[ranked][1:] == exit_[ranked][:-1])))
+        best = np.maximum.accumulate(np.where(same, 0, np.arange(len(ranked))))
+        weak = unitigs.coverage[ranked] * COVERAGE_RATIO <= unitigs.coverage[ranked[best]]
+        doomed = np.zeros(len(unitigs.starts), dtype=bool)
+        doomed[ranked[same & weak]] = True
+        return self._remove(unitigs, doomed)
+
+    def smallest_canonical(self, unitigs: Unitigs) -> np.ndarray:
+        # Identical for a unitig and its reverse complement, and unique to that pair
+        if not len(unitigs.nodes):
+            return np.zeros(0, dtype=np.uint64)
+        return np.minimum.reduceat(canonical_codes(self.codes[unitigs.nodes], self.k), unitigs.starts)
+
+    def _remove(self, unitigs: Unitigs, selected: np.ndarray) -> int:
+        if not selected.any():
+            return 0
+        self.alive[unitigs.nodes[np.repeat(selected, unitigs.lengths)]] = False
+        return int(selected.sum())
+
+    def clean(self, tip_length: int = None, bubble_length: int = None) -> Unitigs:
+        tip_length = tip_length or 2 * self.k
+        bubble_length = bubble_length or 2 * self.k
+        unitigs = self.unitigs()
+        for _ in range(MAX_CLEANING_ROUNDS):
+            removed = self.remove_tips(unitigs, tip_length)
+            if removed:
+                unitigs = self.unitigs()
+            removed += self.remove_bubbles(unitigs, bubble_length)
+            if not removed:
+                break
+            unitigs = self.unitigs()
+        return unitigs
+
+
+def _rank_chains(following: np.ndarray, alive: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Head of each node's chain and its distance from it. Chains closed into cycles are cut at their
+    # smallest node first, so every chain has a head.
+    count = len(following)
+    previous = np.full(count, -1, dtype=np.int64)
+    linked = following >= 0
+    previous[following[linked]] = np.flatnonzero(linked)
+
+    head, offset, pointer = _jump(previous)
+    cyclic = alive & (pointer >= 0)
+    if cyclic.any():
+        smallest = np.arange(count)
+        pointer = np.where(cyclic, previous, -1)
+        for _ in range(int(np.ceil(np.log2(count + 1))) + 1):
+            moving = pointer >= 0
+            smallest[moving] = np.minimum(smallest[moving], smallest[pointer[moving]])
+            pointer[moving] = pointer[pointer[moving]]
+        cuts = np.flatnonzero(cyclic & (smallest == np.arange(count)))
+        previous[cuts] = -1
+        head, offset, _ = _jump(previous)
+    return head, offset
+
+
+def _jump(previous: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    count = len(previous)
+    head = np.where(previous >= 0, previous, np.arange(count))
+    offset = (previous >= 0).astype(np.int64)
+    pointer = previous.copy()
+    for _ in range(int(np.ceil(np.log2(count + 1))) + 1):
+        moving = pointer >= 0
+        if not moving.any():
+            break
+        targets = pointer[moving]
+        offset[moving] += offset[targets]
+        head[moving] = head[targets]
+        pointer[moving] = pointer[targets]
+    return head, offset, pointer
+
+
+def assemble_debruijn(reads: Iterable[str], k: int = DEFAULT_K, min_count: int = None, both_strands: bool = True,
+                      min_length: int = None) -> List[Tuple[str, float]]:
+    # Returns (contig, mean k-mer coverage) pairs, longest first; with both strands each contig
+    # is reported once rather than together with its reverse complement
+    graph = DeBruijnGraph.from_reads(reads, k, min_count, both_strands)
+    unitigs = graph.clean()
+    min_length = min_length or 2 * k
+    contigs = {}
+    keys = graph.smallest_canonical(unitigs).tolist() if both_strands else range(len(unitigs.starts))
+    for key, sequence, coverage in zip(keys, graph.spell(unitigs), unitigs.coverage.tolist()):
+        if len(sequence) >= min_length and (key not in contigs or sequence < contigs[key][0]):
+            contigs[key] = (sequence, coverage)
+    return sorted(contigs.values(), key=lambda contig: len(contig[0]), reverse=True)
+
+
+def write_contigs(handle: TextIO, contigs: Sequence[Tuple[str, float]], prefix: str = 'contig'):
+    for i, (sequence, coverage) in enumerate(contigs, 1):
+        handle.write(f">{prefix}_{i} length={len(sequence)} coverage={coverage:.1f}\n")
+        for j in range(0, len(sequence), 60):
+            handle.write(sequence[j:j + 60] + "\n")
@@ -0,0 +1,59 @@
+from typing import Tuple
+
+import numpy as np
+
+POINTS_PER_PIXEL = 2
+DEFAULT_PIXELS = 1000
+
+
+def envelope_decimate(x: np.ndarray, y: np.ndarray, bins: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Keeps the min and max of every bin, so peaks survive even at 1000x reduction
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    if len(y) <= 2 * bins or bins <= 0:
+        return x, y
+    edges = np.linspace(0, len(y), bins + 1).astype(np.int64)[:-1]
+    edges = np.unique(edges)
+    lows = np.fmin.reduceat(y, edges)
+    highs = np.fmax.reduceat(y, edges)
+    bin_x = x[edges]
+    decimated_x = np.repeat(bin_x, 2)
+    decimated_y = np.empty(2 * len(edges), dtype=np.float64)
+    decimated_y[0::2] = lows
+    decimated_y[1::2] = highs
+    return decimated_x, decimated_y
+
+
+class DecimatedLine:
+    # A Line2D that only ever holds ~2 points per pixel of the visible x range
+    # and re-decimates the full-resolution data whenever the axes are zoomed or panned.
+    def __init__(self, ax, x, y, points_per_pixel: int = POINTS_PER_PIXEL, **plot_kwargs):
+        self.ax = ax
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        self.points_per_pixel = points_per_pixel
+        self.line, = ax.plot(*envelope_decimate(self.x, self.y, self._bins()), **plot_kwargs)
+        # Matplotlib only keeps weak references to callbacks, the line keeps this object alive
+        self.line.decimator = self
+        self.callback_id = ax.callbacks.connect('xlim_changed', self.update)
+
+    def _bins(self) -> int:
+        try:
+            pixels = self.ax.get_window_extent().width
+        except Exception:
+            pixels = DEFAULT_PIXELS
+        return max(int(pixels * self.points_per_pixel / 2), 1)
+
+    def update(self, ax=None):
+        if self.line.axes is None or len(self.x) == 0:
+            return
+        low, high = sorted(self.ax.get_xlim())
+        start = max(np.searchsorted(self.x, low, side='left') - 1, 0)
+        end = min(np.searchsorted(self.x, high, side='right') + 1, len(self.x))
+        self.line.set_data(*envelope_decimate(self.x[start:end], self.y[start:end], self._bins()))
+
+
+def plot_decimated(ax, x, y=None, **plot_kwargs):
+    if y is None:
+        x, y = np.arange(len(x)), x
+    return DecimatedLine(ax, x, y, **plot_kwargs).line
@@ -0,0 +1,116 @@
+import gzip
+from typing import BinaryIO, Iterator, Tuple
+
+CHUNK_SIZE = 1 << 20
+GZIP_MAGIC = b'\x1f\x8b'
+WHITESPACE = b' \t\r\n'
+
+
+def open_fasta(filename: str) -> BinaryIO:
+    with open(filename, 'rb') as f:
+        magic = f.read(2)
+    if magic == GZIP_MAGIC:
+        return gzip.open(filename, 'rb')
+    return open(filename, 'rb')
+
+
+def _fasta_pieces(f: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[bool, bytes]]:
+    # Yields (True, header line) for each header and (False, raw sequence bytes) for everything between.
+    # Chunks are scanned with find rather than re-split, so every byte is copied once however long the lines.
+    header = None
+    line_start = True
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        pos = 0
+        while pos < len(chunk):
+            if header is not None:
+                end = chunk.find(b'\n', pos)
+                if end == -1:
+                    header += chunk[pos:]
+                    break
+                header += chunk[pos:end]
+                yield True, bytes(header)
+                header, pos, line_start = None, end + 1, True
+            elif line_start and chunk[pos] == ord('>'):
+                header = bytearray()
+                header += b'>'
+                pos += 1
+            else:
+                end = chunk.find(b'\n>', pos)
+                if end == -1:
+                    yield False, chunk[pos:]
+                    line_start = chunk.endswith(b'\n')
+                    break
+                yield False, chunk[pos:end + 1]
+                pos, line_start = end + 1, True
+    if header is not None:
+        yield True, bytes(header)
+
+
+def read_fasta_records(filename: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, bytes]]:
+    # Yields (record id, uppercase sequence bytes) one record at a time.
+    # Sequence pieces go into a bytearray, so loading stays linear in the file size.
+    record_id = None
+    sequence = bytearray()
+    with open_fasta(filename) as f:
+        for is_header, data in _fasta_pieces(f, chunk_size):
+            if is_header:
+                if record_id is not None:
+                    yield record_id, bytes(sequence).upper()
+                record_id = _parse_header(data)
+                sequence = bytearray()
+            elif record_id is not None:
+                sequence += data.translate(None, WHITESPACE)
+    if record_id is not None:
+        yield record_id, bytes(sequence).upper()
+
+
+def read_fasta_chunks(filename: str, chunk_bases: int, overlap: int = 0,
+                      chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, bytes]]:
+    # Yields (record id, sequence chunk) without ever holding a whole record.
+    # Consecutive chunks of a record share `overlap` bases.
+    if chunk_bases <= overlap:
+        raise ValueError("chunk_bases must be larger than overlap")
+    record_id = None
+    sequence = bytearray()
+    emitted = False
+
+    def flush(final):
+        nonlocal sequence, emitted
+        while len(sequence) >= chunk_bases:
+            yield record_id, bytes(sequence[:chunk_bases]).upper()
+            del sequence[:chunk_bases - overlap]
+            emitted = True
+        if final and (len(sequence) > overlap or not emitted) and sequence:
+            yield record_id, bytes(sequence).upper()
+
+    with open_fasta(filename) as f:
+        for is_header, data in _fasta_pieces(f, chunk_size):
+            if is_header:
+                if record_id is not None:
+                    yield from flush(True)
+                record_id = _parse_header(data)
+                sequence = bytearray()
+                emitted = False
+            elif record_id is not None:
+                sequence += data.translate(None, WHITESPACE)
+                yield from flush(False)
+    if record_id is not None:
+        yield from flush(True)
+
+
+def read_fasta_dict(filename: str) -> dict:
+    return {record_id: sequence for record_id, sequence in read_fasta_records(filename)}
+
+
+def read_first_record(filename: str) -> Tuple[str, bytes]:
+    for record in read_fasta_records(filename):
+        return record
+    raise ValueError(f"No FASTA records found in {filename}")
+
+
+def _parse_header(line: bytes) -> str:
+    header = line[1:].strip().decode('utf-8', errors='replace')
+    return header.split()[0] if header else ''
@@ -0,0 +1,183 @@
+import mmap
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from bioutils.fasta import GZIP_MAGIC, read_fasta_records
+
+REGION_PATTERN = re.compile(r'^(?P<name>[^:]+)(?::(?P<start>[\d,]+)(?:-(?P<end>[\d,]+))?)?$')
+
+
+class IndexEntry(NamedTuple):
+    name: str
+    length: int
+    offset: int
+    line_bases: int     # 0 for a record whose lines can't be addressed by arithmetic
+    line_width: int
+
+
+def index_path(filename: str) -> str:
+    return filename + '.fai'
+
+
+def build_fasta_index(filename: str) -> List[IndexEntry]:
+    # Same layout as samtools faidx: name, length, offset, bases per line, bytes per line.
+    # Blank lines before a record's first bases are skipped. A record with uneven line widths or
+    # blank lines among its bases is still listed, with line_bases 0, and read without the index.
+    entries = []
+    name = None
+    length = offset = line_bases = line_width = 0
+    short_line_seen = irregular = False
+
+    def entry():
+        if irregular:
+            return IndexEntry(name, length, offset, 0, 0)
+        return IndexEntry(name, length, offset, line_bases, line_width)
+
+    with open(filename, 'rb') as f:
+        if f.read(2) == GZIP_MAGIC:
+            raise ValueError(f"{filename} is gzip compressed, indexed access needs a plain FASTA file")
+        f.seek(0)
+        position = 0
+        for line in f:
+            line_start = position
+            position += len(line)
+            if line.startswith(b'>'):
+                if name is not None:
+                    entries.append(entry())
+                header = line[1:].strip().decode('utf-8', errors='replace')
+                name = header.split()[0] if header else ''
+                length = line_bases = line_width = 0
+                offset = position
+                short_line_seen = irregular = False
+                continue
+            if name is None:
+                continue
+            bases = len(line.rstrip(b'\r\n'))
+            if bases == 0:
+                short_line_seen = line_bases > 0
+                continue
+            length += bases
+            if line_bases == 0:
+                line_bases = bases
+                line_width = len(line)
+                offset = line_start
+            elif (short_line_seen or bases > line_bases
+                  or (bases == line_bases and len(line) != line_width and line.endswith(b'\n'))):
+                irregular = True
+            if bases < line_bases:
+                short_line_seen = True
+
+    if name is not None:
+        entries.append(entry())
+    return entries
+
+
+def write_fasta_index(entries: List[IndexEntry], path: str):
+    with open(path, 'w') as f:
+        for entry in entries:
+            f.write('\t'.join(str(value) for value in entry) + '\n')
+
+
+def read_fasta_index(path: str) -> List[IndexEntry]:
+    entries = []
+    with open(path, 'r') as f:
+        for line in f:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) < 5:
+                continue
+            entries.append(IndexEntry(fields[0], *(int(value) for value in fields[1:5])))
+    return entries
+
+
+def load_or_build_index(filename: str) -> List[IndexEntry]:
+    path = index_path(filename)
+    if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(filename):
+        return read_fasta_index(path)
+    entries = build_fasta_index(filename)
+    try:
+        write_fasta_index(entries, path)
+    except OSError:
+        pass  # read-only location, keep the index in memory only
+    return entries
+
+
+def parse_region(region: str) -> Tuple[str, Optional[int], Optional[int]]:
+    # "chr:start-end" is 1-based and inclusive, returned as a 0-based half-open range
+    match = REGION_PATTERN.match(region.strip())
+    if not match:
+        raise ValueError(f"Invalid region: {region}")
+    start = match.group('start')
+    end = match.group('end')
+    start = int(start.replace(',', '')) - 1 if start else None
+    end = int(end.replace(',', '')) if end else None
+    return match.group('name'), start, end
+
+
+class FastaIndex:
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.entries: Dict[str, IndexEntry] = {entry.name: entry for entry in load_or_build_index(filename)}
+        self._file = open(filename, 'rb')
+        if os.path.getsize(filename) > 0:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._map = b''
+        self._unindexed: Dict[str, bytes] = {}
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def length(self, name: str) -> int:
+        return self._entry(name).length
+
+    def fetch(self, name: str, start: Optional[int] = None, end: Optional[int] = None) -> bytes:
+        entry = self._entry(name)
+        start = 0 if start is None else max(0, start)
+        end = entry.length if end is None else min(end, entry.length)
+        if start >= end:
+            return b''
+        if entry.line_bases == 0:
+            return self._read_unindexed(name)[start:end]
+        first = self._byte_offset(entry, start)
+        last = self._byte_offset(entry, end - 1) + 1
+        return self._map[first:last].translate(None, b'\r\n').upper()
+
+    def fetch_region(self, region: str) -> bytes:
+        return self.fetch(*parse_region(region))
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _read_unindexed(self, name: str) -> bytes:
+        # Records the index can't address are parsed from the file, all in one pass, and kept
+        if name not in self._unindexed:
+            wanted = {entry.name for entry in self.entries.values() if entry.line_bases == 0 and entry.length}
+            self._unindexed = {record_id: sequence for record_id, sequence in read_fasta_records(self.filename)
+                               if record_id in wanted}
+        return self._unindexed[name]
+
+    def _entry(self, name: str) -> IndexEntry:
+        if name not in self.entries:
+            raise KeyError(f"Record '{name}' not found in {self.filename}")
+        return self.entries[name]
+
+    @staticmethod
+    def _byte_offset(entry: IndexEntry, position: int) -> int:
+        line, column = divmod(position, entry.line_bases)
+        return entry.offset + line * entry.line_width + column
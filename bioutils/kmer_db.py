@@ -0,0 +1,122 @@
+import os
+import struct
+from typing import Iterable, List, Union
+
+import numpy as np
+
+from bioutils.kmer_stream import count_kmers_in_file
+from bioutils.kmers import encode_kmer, merge_count_tables
+
+MAGIC = b'KMERDB01'
+# magic, k, canonical flag, number of k-mers, length of the source path
+HEADER = struct.Struct('<8sIIQI')
+
+
+def db_path(filename: str, k: int, canonical: bool = False) -> str:
+    return f"{filename}.k{k}{'c' if canonical else ''}.kmerdb"
+
+
+def _data_offset(source: bytes) -> int:
+    # Arrays start on an 8-byte boundary so they can be memory-mapped directly
+    return -(-(HEADER.size + len(source)) // 8) * 8
+
+
+def write_kmer_db(path: str, codes: np.ndarray, counts: np.ndarray, k: int, source: str = '',
+                  canonical: bool = False):
+    codes = np.asarray(codes, dtype=np.uint64)
+    counts = np.asarray(counts, dtype=np.uint64)
+    if len(codes) > 1 and np.any(codes[1:] <= codes[:-1]):
+        codes, counts = merge_count_tables([(codes, counts)])
+    encoded_source = source.encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, k, int(canonical), len(codes), len(encoded_source)))
+        f.write(encoded_source)
+        f.write(b'\0' * (_data_offset(encoded_source) - HEADER.size - len(encoded_source)))
+        f.write(codes.tobytes())
+        f.write(counts.tobytes())
+
+
+class KmerDatabase:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, self.k, canonical, size, source_length = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a k-mer database")
+            source = f.read(source_length)
+        self.canonical = bool(canonical)
+        self.source = source.decode('utf-8')
+        offset = _data_offset(source)
+        if size:
+            self.codes = np.memmap(path, dtype=np.uint64, mode='r', offset=offset, shape=(size,))
+            self.counts = np.memmap(path, dtype=np.uint64, mode='r', offset=offset + 8 * size, shape=(size,))
+        else:
+            self.codes = np.zeros(0, dtype=np.uint64)
+            self.counts = np.zeros(0, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _as_codes(self, kmers: Union[np.ndarray, Iterable[str]]) -> np.ndarray:
+        if isinstance(kmers, np.ndarray):
+            return kmers.astype(np.uint64, copy=False)
+        kmers = list(kmers)
+        if kmers and isinstance(kmers[0], str):
+            if any(len(kmer) != self.k for kmer in kmers):
+                raise ValueError(f"All queried k-mers must have length {self.k}")
+            return np.array([encode_kmer(kmer) for kmer in kmers], dtype=np.uint64)
+        return np.array(kmers, dtype=np.uint64)
+
+    def query(self, kmers: Union[np.ndarray, Iterable[str]]) -> np.ndarray:
+        # Batched binary search: count per queried k-mer, 0 when absent
+        queries = self._as_codes(kmers)
+        if len(self.codes) == 0:
+            return np.zeros(len(queries), dtype=np.uint64)
+        index = np.minimum(np.searchsorted(self.codes, queries), len(self.codes) - 1)
+        found = self.codes[index] == queries
+        return np.where(found, self.counts[index], 0).astype(np.uint64)
+
+    def contains(self, kmers: Union[np.ndarray, Iterable[str]]) -> np.ndarray:
+        return self.query(kmers) > 0
+
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    def close(self):
+        # Dropping the memmaps unmaps the file as soon as no other array still refers to it
+        self.codes = np.zeros(0, dtype=np.uint64)
+        self.counts = np.zeros(0, dtype=np.uint64)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def build_kmer_db(filename: str, k: int, path: str = None, canonical: bool = False, **options) -> str:
+    path = path or db_path(filename, k, canonical)
+    codes, counts = count_kmers_in_file(filename, k, canonical, **options)
+    write_kmer_db(path, codes, counts, k, os.path.abspath(filename), canonical)
+    return path
+
+
+def load_or_build_kmer_db(filename: str, k: int, canonical: bool = False, **options) -> KmerDatabase:
+    path = db_path(filename, k, canonical)
+    if not (os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(filename)):
+        build_kmer_db(filename, k, path, canonical, **options)
+    return KmerDatabase(path)
+
+
+def merge_kmer_dbs(paths: List[str], output_path: str) -> str:
+    databases = [KmerDatabase(path) for path in paths]
+    try:
+        if len({(db.k, db.canonical) for db in databases}) > 1:
+            raise ValueError("Only databases with the same k and strand mode can be merged")
+        codes, counts = merge_count_tables([(db.codes, db.counts) for db in databases])
+        source = ';'.join(db.source for db in databases)
+        write_kmer_db(output_path, codes, counts, databases[0].k, source, databases[0].canonical)
+    finally:
+        for db in databases:
+            db.close()
+    return output_path
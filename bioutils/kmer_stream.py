@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+from multiprocessing import Pool, cpu_count
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from bioutils.fasta import read_fasta_chunks
+from bioutils.kmers import canonical_codes, count_codes, kmer_codes, merge_count_tables
+
+CHUNK_BASES = 4 << 20
+HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def iter_chunks(filename: str, k: int, chunk_bases: int = CHUNK_BASES) -> Iterator[bytes]:
+    # Consecutive chunks share k - 1 bases so no k-mer is lost or counted twice
+    for _, chunk in read_fasta_chunks(filename, chunk_bases, overlap=k - 1):
+        yield chunk
+
+
+def shard_of(codes: np.ndarray, num_shards: int) -> np.ndarray:
+    # Fibonacci hashing spreads neighbouring codes evenly across shards
+    return ((codes * HASH_MULTIPLIER) >> np.uint64(32)) % np.uint64(num_shards)
+
+
+def _count_chunk(args) -> List[Tuple[np.ndarray, np.ndarray]]:
+    chunk, k, canonical, num_shards = args
+    codes, _ = kmer_codes(chunk, k)
+    if canonical:
+        codes = canonical_codes(codes, k)
+    unique, counts = count_codes(codes, k)
+    shards = shard_of(unique, num_shards)
+    return [(unique[shards == shard], counts[shards == shard]) for shard in range(num_shards)]
+
+
+class _ShardStore:
+    # Partial tables per shard, kept in memory or spilled to .npz files. In memory, a shard's
+    # pending partials are merged into its running table once they are as large as it, which keeps
+    # the parent near the size of the merged tables at an amortized O(log n) merges per k-mer.
+    def __init__(self, num_shards: int, spill_dir: Optional[str]):
+        self.num_shards = num_shards
+        self.spill_dir = spill_dir
+        self.tables = [[] for _ in range(num_shards)]
+        self.pending = [0] * num_shards
+        self.spilled = [0] * num_shards
+
+    def add(self, shard: int, codes: np.ndarray, counts: np.ndarray):
+        if len(codes) == 0:
+            return
+        if self.spill_dir is None:
+            tables = self.tables[shard]
+            tables.append((codes, counts))
+            self.pending[shard] += len(codes)
+            if len(tables) > 1 and self.pending[shard] >= len(tables[0][0]):
+                self.tables[shard] = [merge_count_tables(tables)]
+                self.pending[shard] = 0
+            return
+        path = os.path.join(self.spill_dir, f"shard{shard}_{self.spilled[shard]}.npz")
+        np.savez(path, codes=codes, counts=counts)
+        self.spilled[shard] += 1
+
+    def load(self, shard: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        if self.spill_dir is None:
+            tables, self.tables[shard] = self.tables[shard], []
+            self.pending[shard] = 0
+            return tables
+        tables = []
+        for part in range(self.spilled[shard]):
+            path = os.path.join(self.spill_dir, f"shard{shard}_{part}.npz")
+            with np.load(path) as data:
+                tables.append((data['codes'], data['counts']))
+            os.remove(path)
+        return tables
+
+
+def count_kmers_sharded(filename: str, k: int, canonical: bool = False, processes: Optional[int] = None,
+                        num_shards: int = 16, chunk_bases: int = CHUNK_BASES,
+                        spill_dir: Optional[str] = None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    # Yields one merged (codes, counts) table per shard. Shards hold disjoint k-mers,
+    # so only one shard's table has to be in memory at a time.
+    processes = processes or cpu_count()
+    own_spill_dir = None
+    if spill_dir == 'auto':
+        spill_dir = own_spill_dir = tempfile.mkdtemp(prefix='kmer_shards_')
+    store = _ShardStore(num_shards, spill_dir)
+
+    try:
+        tasks = ((chunk, k, canonical, num_shards) for chunk in iter_chunks(filename, k, chunk_bases))
+        with Pool(processes) as pool:
+            for partial in pool.imap_unordered(_count_chunk, tasks):
+                for shard, (codes, counts) in enumerate(partial):
+                    store.add(shard, codes, counts)
+
+            shard_tables = (store.load(shard) for shard in range(num_shards))
+            for merged in pool.imap(merge_count_tables, shard_tables):
+                yield merged
+    finally:
+        if own_spill_dir:
+            shutil.rmtree(own_spill_dir, ignore_errors=True)
+
+
+def count_kmers_in_file(filename: str, k: int, canonical: bool = False, **options) -> Tuple[np.ndarray, np.ndarray]:
+    # Convenience wrapper that gathers all shards into one sorted table
+    shards = list(count_kmers_sharded(filename, k, canonical, **options))
+    codes = np.concatenate([codes for codes, _ in shards])
+    counts = np.concatenate([counts for _, counts in shards])
+    order = np.argsort(codes)
+    return codes[order], counts[order]
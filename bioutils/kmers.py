@@ -0,0 +1,144 @@
+from typing import Dict, Sequence, Tuple, Union
+
+import numpy as np
+
+from bioutils.packed import BASES, PackedSequence, as_packed
+
+MAX_K = 31
+# Up to 4^12 (16M) bins a dense bincount table beats sorting
+DENSE_MAX_K = 12
+STRANDS = ('forward', 'reverse', 'both')
+
+SequenceLike = Union[str, bytes, PackedSequence]
+
+
+def _check_k(k: int):
+    if not 1 <= k <= MAX_K:
+        raise ValueError(f"k must be between 1 and {MAX_K}, got {k}")
+
+
+def encode_kmer(kmer: str) -> int:
+    code = 0
+    for base in kmer.upper():
+        code = (code << 2) | BASES.index(base)
+    return code
+
+
+def decode_kmer(code: int, k: int) -> str:
+    letters = []
+    for _ in range(k):
+        letters.append(BASES[code & 3])
+        code >>= 2
+    return ''.join(reversed(letters))
+
+
+def kmer_codes(sequence: SequenceLike, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Integer code of every k-mer (2 bits per base, first base highest) and its start position.
+    # Windows touching an ambiguous base are dropped.
+    _check_k(k)
+    packed = as_packed(sequence)
+    total = len(packed) - k + 1
+    if total <= 0:
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.int64)
+
+    # Codes of windows of 1, 2, 4, ... bases are built by doubling and the ones making up k are
+    # concatenated, which takes about 2 * log2(k) passes over the sequence instead of k
+    windows = packed.codes.astype(np.uint64)
+    parts = {}
+    width = 1
+    while True:
+        if k & width:
+            parts[width] = windows
+        if width * 2 > k:
+            break
+        windows = (windows[:-width] << np.uint64(2 * width)) | windows[width:]
+        width *= 2
+    codes = np.zeros(total, dtype=np.uint64)
+    offset = 0
+    for width in sorted(parts, reverse=True):
+        codes <<= np.uint64(2 * width)
+        codes |= parts[width][offset:offset + total]
+        offset += width
+
+    positions = np.arange(total, dtype=np.int64)
+    if len(packed.mask_starts):
+        ambiguous = np.concatenate(([0], np.cumsum(packed.ambiguous_mask(), dtype=np.int64)))
+        valid = ambiguous[k:] == ambiguous[:total]
+        return codes[valid], positions[valid]
+    return codes, positions
+
+
+def reverse_complement_codes(codes: np.ndarray, k: int) -> np.ndarray:
+    # Complement is 3 - code (bitwise NOT), then reverse the order of the 2-bit groups
+    x = ~codes.astype(np.uint64)
+    for shift, mask in ((2, 0x3333333333333333), (4, 0x0F0F0F0F0F0F0F0F),
+                        (8, 0x00FF00FF00FF00FF), (16, 0x0000FFFF0000FFFF)):
+        shift = np.uint64(shift)
+        mask = np.uint64(mask)
+        x = ((x >> shift) & mask) | ((x & mask) << shift)
+    x = (x >> np.uint64(32)) | (x << np.uint64(32))
+    return x >> np.uint64(64 - 2 * k)
+
+
+def canonical_codes(codes: np.ndarray, k: int) -> np.ndarray:
+    return np.minimum(codes, reverse_complement_codes(codes, k))
+
+
+def strand_codes(sequence: SequenceLike, k: int, canonical: bool = False, strand: str = 'forward') -> np.ndarray:
+    if strand not in STRANDS:
+        raise ValueError(f"strand must be one of {STRANDS}, got {strand}")
+    codes, _ = kmer_codes(sequence, k)
+    if canonical:
+        return canonical_codes(codes, k)
+    if strand == 'reverse':
+        return reverse_complement_codes(codes, k)
+    if strand == 'both':
+        return np.concatenate((codes, reverse_complement_codes(codes, k)))
+    return codes
+
+
+def count_codes(codes: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    if k <= DENSE_MAX_K:
+        dense = np.bincount(codes.astype(np.int64), minlength=4 ** k)
+        present = np.flatnonzero(dense)
+        return present.astype(np.uint64), dense[present]
+    unique, counts = np.unique(codes, return_counts=True)
+    return unique, counts
+
+
+def merge_count_tables(tables: Sequence[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+    # Sums any number of (codes, counts) tables into one table sorted by code
+    if not len(tables):
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.uint64)
+    codes = np.concatenate([np.asarray(codes, dtype=np.uint64) for codes, _ in tables])
+    counts = np.concatenate([np.asarray(counts, dtype=np.uint64) for _, counts in tables])
+    if len(codes) == 0:
+        return codes, counts
+    order = np.argsort(codes, kind='stable')
+    codes = codes[order]
+    counts = counts[order]
+    starts = np.flatnonzero(np.concatenate(([True], codes[1:] != codes[:-1])))
+    return codes[starts], np.add.reduceat(counts, starts)
+
+
+def count_kmers(sequence: SequenceLike, k: int, canonical: bool = False,
+                strand: str = 'forward') -> Tuple[np.ndarray, np.ndarray]:
+    # Sorted (codes, counts) of the k-mers that occur
+    return count_codes(strand_codes(sequence, k, canonical, strand), k)
+
+
+def dense_kmer_counts(sequence: SequenceLike, k: int, canonical: bool = False,
+                      strand: str = 'forward') -> np.ndarray:
+    if k > DENSE_MAX_K:
+        raise ValueError(f"A dense table is limited to k <= {DENSE_MAX_K}, use count_kmers instead")
+    codes = strand_codes(sequence, k, canonical, strand)
+    return np.bincount(codes.astype(np.int64), minlength=4 ** k)
+
+
+def kmer_percentages(sequence: SequenceLike, k: int, canonical: bool = False,
+                     strand: str = 'forward') -> Dict[str, float]:
+    codes, counts = count_kmers(sequence, k, canonical, strand)
+    total = counts.sum()
+    if total == 0:
+        return {}
+    return {decode_kmer(int(code), k): count / total * 100 for code, count in zip(codes, counts)}
@@ -0,0 +1,149 @@
+from typing import Iterator, Tuple
+
+import numpy as np
+
+from bioutils.fasta import read_fasta_chunks
+from bioutils.kmers import MAX_K, kmer_codes, reverse_complement_codes
+from bioutils.packed import PackedSequence, as_packed
+from bioutils.windows import SequenceLike, window_composition
+
+DEFAULT_NA_CONC = 0.05
+CHUNK_WINDOWS = 1 << 20
+
+
+def wallace_tm(gc_count, at_count):
+    # Tm = 4(G + C) + 2(A + T)
+    return 4 * gc_count + 2 * at_count
+
+
+def salt_adjusted_tm(gc_count, length, na_conc=DEFAULT_NA_CONC):
+    # Tm = 81.5 + 16.6 log10([Na+]) + 0.41 (%GC) - 600 / length
+    gc_percent = gc_count / length * 100
+    return 81.5 + 16.6 * np.log10(na_conc) + 0.41 * gc_percent - 600 / length
+
+
+def tm_profile(sequence: SequenceLike, window_size: int = 8, step: int = 1,
+               na_conc: float = DEFAULT_NA_CONC) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Both formulas for every window at once from cumulative base counts.
+    # Returns 0-based window starts, Wallace Tm and salt-adjusted Tm.
+    starts, counts = window_composition(sequence, window_size, step, 'ACGT', relative=False)
+    gc_count = counts[1] + counts[2]
+    at_count = counts[0] + counts[3]
+    return starts, wallace_tm(gc_count, at_count), salt_adjusted_tm(gc_count, window_size, na_conc)
+
+
+def tm_profile_chunks(filename: str, window_size: int = 8, step: int = 1, na_conc: float = DEFAULT_NA_CONC,
+                      chunk_windows: int = CHUNK_WINDOWS) -> Iterator[Tuple[str, np.ndarray, np.ndarray, np.ndarray]]:
+    # Streams (record id, starts, wallace, salt-adjusted) per chunk so whole genomes never sit in memory.
+    # Chunks advance by a multiple of step, which keeps the window grid continuous across chunks.
+    chunk_windows = max(chunk_windows // step, 1) * step
+    chunk_bases = chunk_windows + window_size - 1
+    current_record = None
+    offset = 0
+    for record_id, chunk in read_fasta_chunks(filename, chunk_bases, overlap=window_size - 1):
+        if record_id != current_record:
+            current_record = record_id
+            offset = 0
+        starts, wallace, salt_adjusted = tm_profile(chunk, window_size, step, na_conc)
+        yield record_id, starts + offset, wallace, salt_adjusted
+        offset += chunk_windows
+
+
+# SantaLucia (1998) unified nearest-neighbor parameters, indexed by the top-strand
+# dinucleotide 4 * first + second (A=0, C=1, G=2, T=3). dH in kcal/mol, dS in cal/(K*mol).
+NN_ENTHALPY = np.array([
+    -7.9, -8.4, -7.8, -7.2,   # AA AC AG AT
+    -8.5, -8.0, -10.6, -7.8,  # CA CC CG CT
+    -8.2, -9.8, -8.0, -8.4,   # GA GC GG GT
+    -7.2, -8.2, -8.5, -7.9,   # TA TC TG TT
+])
+NN_ENTROPY = np.array([
+    -22.2, -22.4, -21.0, -20.4,
+    -22.7, -19.9, -27.2, -21.0,
+    -22.2, -24.4, -19.9, -22.4,
+    -21.3, -22.2, -22.7, -22.2,
+])
+# Initiation with a terminal G.C or A.T pair, counted once per duplex end
+TERMINAL_GC = (0.1, -2.8)
+TERMINAL_AT = (2.3, 4.1)
+SYMMETRY_ENTROPY = -1.4
+GAS_CONSTANT = 1.987
+DEFAULT_OLIGO_CONC = 0.25e-6
+
+
+def monovalent_equivalent(na_conc=DEFAULT_NA_CONC, mg_conc=0.0, dntp_conc=0.0):
+    # von Ahsen et al. (2001): [Na+]eq = [Na+] + 120 * sqrt([Mg2+] - [dNTP]), concentrations in mM
+    free_mg = np.maximum(np.subtract(mg_conc, dntp_conc), 0.0) * 1000
+    return na_conc + 120 * np.sqrt(free_mg) / 1000
+
+
+def _self_complementary(codes: np.ndarray, starts: np.ndarray, window_size: int) -> np.ndarray:
+    k = min(window_size, MAX_K)
+    prefix_codes = np.zeros(len(codes), dtype=np.uint64)
+    all_codes, positions = kmer_codes(PackedSequence(codes), k)
+    prefix_codes[positions] = all_codes
+    candidates = prefix_codes[starts] == reverse_complement_codes(prefix_codes[starts + window_size - k], k)
+    if window_size > k:
+        # Long windows: prefix/suffix test nominates candidates, verify them in full
+        for index in np.flatnonzero(candidates):
+            window = codes[starts[index]:starts[index] + window_size]
+            candidates[index] = np.array_equal(window, 3 - window[::-1])
+    return candidates
+
+
+def terminal_corrections(first: np.ndarray, last: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    delta_h = np.zeros(len(first))
+    delta_s = np.zeros(len(first))
+    for terminal in (first, last):
+        at_end = (terminal == 0) | (terminal == 3)
+        delta_h += np.where(at_end, TERMINAL_AT[0], TERMINAL_GC[0])
+        delta_s += np.where(at_end, TERMINAL_AT[1], TERMINAL_GC[1])
+    return delta_h, delta_s
+
+
+def nn_tm_from_sums(delta_h: np.ndarray, delta_s: np.ndarray, length, symmetric: np.ndarray,
+                    na_conc=DEFAULT_NA_CONC, mg_conc=0.0, dntp_conc=0.0, oligo_conc=DEFAULT_OLIGO_CONC) -> np.ndarray:
+    # delta_h/delta_s already include the nearest-neighbor and terminal terms.
+    # SantaLucia salt correction on the entropy term, with Mg2+/dNTP folded into [Na+].
+    delta_s = delta_s + 0.368 * (np.asarray(length) - 1) * np.log(monovalent_equivalent(na_conc, mg_conc, dntp_conc))
+    delta_s = delta_s + np.where(symmetric, SYMMETRY_ENTROPY, 0.0)
+    strand_conc = np.where(symmetric, oligo_conc, oligo_conc / 4)
+    return delta_h * 1000 / (delta_s + GAS_CONSTANT * np.log(strand_conc)) - 273.15
+
+
+def nn_tm_profile(sequence: SequenceLike, window_size: int = 20, step: int = 1, na_conc: float = DEFAULT_NA_CONC,
+                  mg_conc: float = 0.0, dntp_conc: float = 0.0,
+                  oligo_conc: float = DEFAULT_OLIGO_CONC) -> Tuple[np.ndarray, np.ndarray]:
+    # Nearest-neighbor Tm for every window: dH/dS sums come from prefix sums over
+    # dinucleotide codes, so each window costs O(1). Windows with ambiguous bases get NaN.
+    if window_size < 2:
+        raise ValueError("Nearest-neighbor Tm needs windows of at least 2 bases")
+    packed = as_packed(sequence)
+    codes = packed.codes
+    total = len(codes) - window_size + 1
+    starts = np.arange(0, max(total, 0), step, dtype=np.int64)
+    if len(starts) == 0:
+        return starts, np.zeros(0)
+
+    pairs = 4 * codes[:-1].astype(np.int64) + codes[1:]
+    enthalpy = np.concatenate(([0.0], np.cumsum(NN_ENTHALPY[pairs])))
+    entropy = np.concatenate(([0.0], np.cumsum(NN_ENTROPY[pairs])))
+    ends = starts + window_size - 1
+    delta_h = enthalpy[ends] - enthalpy[starts]
+    delta_s = entropy[ends] - entropy[starts]
+
+    terminal_h, terminal_s = terminal_corrections(codes[starts], codes[ends])
+    symmetric = _self_complementary(codes, starts, window_size)
+    tm = nn_tm_from_sums(delta_h + terminal_h, delta_s + terminal_s, window_size, symmetric,
+                         na_conc, mg_conc, dntp_conc, oligo_conc)
+
+    if len(packed.mask_starts):
+        ambiguous = np.concatenate(([0], np.cumsum(packed.ambiguous_mask(), dtype=np.int64)))
+        tm[ambiguous[starts + window_size] != ambiguous[starts]] = np.nan
+    return starts, tm
+
+
+def nn_tm(dna: str, na_conc: float = DEFAULT_NA_CONC, mg_conc: float = 0.0, dntp_conc: float = 0.0,
+          oligo_conc: float = DEFAULT_OLIGO_CONC) -> float:
+    _, tm = nn_tm_profile(dna, len(dna), 1, na_conc, mg_conc, dntp_conc, oligo_conc)
+    return float(tm[0])
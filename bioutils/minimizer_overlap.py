@@ -0,0 +1,244 @@
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from bioutils.kmers import kmer_codes
+from bioutils.overlap_graph import OverlapGraph, distinct_reads
+from bioutils.packed import ENCODE_TABLE
+from bioutils.sketch import splitmix64
+
+VERIFY_CHUNK = 16_384
+PAD = 5  # never equal to a base code or to the other padding value
+INFINITY = 10_000  # fits int16 with room for the offsets added in each row
+
+
+class Candidates(NamedTuple):
+    sources: np.ndarray     # read whose end may overlap ...
+    targets: np.ndarray     # ... the start of this read
+    diagonals: np.ndarray   # estimated start of the target inside the source
+    shared: np.ndarray      # minimizers supporting the pair
+
+
+class Alignments(NamedTuple):
+    lengths: np.ndarray     # bases of the target covered by the overlap (0 when none passed)
+    errors: np.ndarray      # edit distance of that overlap
+    contained: np.ndarray   # the whole target aligns inside the source
+
+
+def _read_codes(reads: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    lengths = np.fromiter((len(read) for read in reads), dtype=np.int64, count=len(reads))
+    width = int(lengths.max(initial=0))
+    codes = np.full((len(reads), width), PAD, dtype=np.uint8)
+    flat = ENCODE_TABLE[np.frombuffer("".join(reads).encode('ascii'), dtype=np.uint8)]
+    rows = np.repeat(np.arange(len(reads)), lengths)
+    columns = np.arange(len(flat)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    codes[rows, columns] = flat
+    return codes, lengths
+
+
+def read_minimizers(reads: Sequence[str], k: int = 15, window: int = 10) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # (hash, read, position) of the smallest hashed k-mer in every run of `window` consecutive k-mers.
+    # Hashing keeps low-complexity k-mers such as poly-A from being picked everywhere.
+    lengths = np.fromiter((len(read) for read in reads), dtype=np.int64, count=len(reads))
+    starts = np.concatenate(([0], np.cumsum(lengths + 1)[:-1])).astype(np.int64)
+    codes, positions = kmer_codes("N".join(reads), k)
+    if len(codes) < window:
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    hashes = splitmix64(codes)
+    owners = np.searchsorted(starts, positions, side='right') - 1
+    first = np.arange(len(codes) - window + 1)
+    last = first + window - 1
+    # A window must hold consecutive k-mers of one read (ambiguous bases leave gaps)
+    valid = (owners[first] == owners[last]) & (positions[last] - positions[first] == window - 1)
+    chosen = first + np.lib.stride_tricks.sliding_window_view(hashes, window).argmin(axis=1)
+    chosen = np.unique(chosen[valid])
+    return hashes[chosen], owners[chosen], positions[chosen] - starts[owners[chosen]]
+
+
+class MinimizerIndex:
+    # Minimizers of the first end_length bases of every read (all of it by default), sorted by hash.
+    # Looking up the full sketch of a read finds every read whose start lies inside it, i.e. all
+    # candidate suffix-prefix overlaps and containments, without comparing all pairs.
+    def __init__(self, reads: Sequence[str], k: int = 15, window: int = 10, end_length: Optional[int] = None):
+        if k < 1 or window < 1:
+            raise ValueError("k and window must be positive")
+        self.reads = list(reads)
+        self.k = k
+        self.window = window
+        self.end_length = end_length
+        self.lengths = np.fromiter((len(read) for read in self.reads), dtype=np.int64, count=len(self.reads))
+        self.hashes, self.owners, self.positions = read_minimizers(self.reads, k, window)
+        limit = int(self.lengths.max(initial=0)) if end_length is None else end_length
+        in_prefix = self.positions + k <= limit
+        order = np.argsort(self.hashes[in_prefix], kind='stable')
+        self.prefix_hashes = self.hashes[in_prefix][order]
+        self.prefix_owners = self.owners[in_prefix][order]
+        self.prefix_positions = self.positions[in_prefix][order]
+
+    def candidates(self, min_overlap: int = 30, band: int = 8, min_shared: int = 2, max_candidates: int = 32,
+                   max_containers: int = 4, max_occurrences: int = 1000) -> Candidates:
+        low = np.searchsorted(self.prefix_hashes, self.hashes, side='left')
+        high = np.searchsorted(self.prefix_hashes, self.hashes, side='right')
+        counts = high - low
+        counts[counts > max_occurrences] = 0  # repeat minimizers nominate too many pairs to be useful
+        total = int(counts.sum())
+        slots = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(low, counts)
+        sources = np.repeat(self.owners, counts)
+        targets = self.prefix_owners[slots]
+        diagonals = np.repeat(self.positions, counts) - self.prefix_positions[slots]
+        keep = (sources != targets) & (diagonals >= -band) & (self.lengths[sources] - diagonals >= min_overlap - band)
+
+        # One candidate per read pair, placed on the median diagonal of its shared minimizers.
+        # Pair and diagonal are packed into one key, which sorts much faster than lexsort.
+        reads = max(len(self.reads), 1)
+        span = int(self.lengths.max(initial=0)) + band + 1
+        keys = np.sort((sources[keep] * reads + targets[keep]) * span + diagonals[keep] + band)
+        pairs = keys // span
+        boundaries = np.ones(len(pairs), dtype=bool)
+        boundaries[1:] = pairs[1:] != pairs[:-1]
+        first = np.flatnonzero(boundaries)
+        shared = np.diff(np.append(first, len(keys)))
+        diagonals = keys[first + shared // 2] % span - band
+        sources, targets = pairs[first] // reads, pairs[first] % reads
+        keep = shared >= min_shared
+        sources, targets, diagonals, shared = sources[keep], targets[keep], diagonals[keep], shared[keep]
+
+        # Greedy layout needs the longest overlaps of each source that extend past it, and dropping
+        # contained reads needs some read around each of them: keep the best few of both kinds
+        extension = diagonals + self.lengths[targets] - self.lengths[sources]
+        keep = (_first_per_group(sources, diagonals, extension > -band, max_candidates)
+                | _first_per_group(targets, -np.minimum(diagonals, -extension), extension <= band, max_containers))
+        return Candidates(sources[keep], targets[keep], diagonals[keep], shared[keep])
+
+
+def _first_per_group(groups: np.ndarray, scores: np.ndarray, eligible: np.ndarray, count: int) -> np.ndarray:
+    # Marks the `count` eligible entries with the lowest scores within each group
+    chosen = np.flatnonzero(eligible)
+    chosen = chosen[np.lexsort((scores[chosen], groups[chosen]))]
+    ordered = groups[chosen]
+    rank = np.arange(len(chosen)) - np.searchsorted(ordered, ordered, side='left')
+    mask = np.zeros(len(groups), dtype=bool)
+    mask[chosen[rank < count]] = True
+    return mask
+
+
+def _banded_alignment(x: np.ndarray, x_lengths: np.ndarray, x_padding: np.ndarray, y: np.ndarray,
+                      y_lengths: np.ndarray, band: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Row i of the DP aligns x[:i] against y[:j] for j in [i - 2 * band, i], stored by offset o = i - j.
+    # The first 2 * band bases of x may be skipped for free (the target starts somewhere in there),
+    # x must be used up and any prefix of y may be, which is exactly a suffix-prefix overlap.
+    # Padding in front of x is skipped and never aligned, so y cannot start before the source.
+    # The left move within a row is a running minimum, so each row is a handful of array operations.
+    # Pairs come longest x first, so the ones still running are always a prefix.
+    pairs = len(x)
+    width = 2 * band + 1
+    offsets = np.arange(width, dtype=np.int16)
+    best = np.full(pairs, INFINITY, dtype=np.int16)
+    best_length = np.zeros(pairs, dtype=np.int64)
+    contained = np.full(pairs, INFINITY, dtype=np.int16)
+    row = np.full((pairs, width), INFINITY, dtype=np.int16)
+    row[:, 0] = 0
+    up = np.full_like(row, INFINITY)
+    last_column = max(y.shape[1] - 1, 0)
+    remaining = -x_lengths
+    for i in range(1, int(x_lengths.max(initial=0)) + 1):
+        active = int(np.searchsorted(remaining, -i, side='right'))
+        previous = row[:active]
+        j = i - offsets
+        current = previous + (y[:active, np.clip(j - 1, 0, last_column)] != x[:active, i - 1, None])
+        up[:active, 1:] = previous[:, :-1] + 1
+        np.minimum(current, up[:active], out=current)
+        invalid = (j[None, :] < 1) | (j[None, :] > y_lengths[:active, None]) | (i <= x_padding[:active, None])
+        if i < width:
+            current[:, i] = 0
+            invalid[:, i] = False
+        current[invalid] = INFINITY
+        current = np.minimum.accumulate((current + offsets)[:, ::-1], axis=1)[:, ::-1] - offsets
+        current[invalid] = INFINITY
+        np.minimum(current, INFINITY, out=current)
+        row[:active] = current
+
+        # The whole of y aligned before x ran out: y lies inside x
+        column = i - y_lengths[:active]
+        inside = np.flatnonzero((column >= 0) & (column < width))
+        contained[inside] = np.minimum(contained[inside], current[inside, column[inside]])
+
+        done = np.flatnonzero(x_lengths[:active] == i)
+        if len(done):
+            # Fewest errors, then the longest overlap
+            choice = np.argmin(current[done], axis=1)
+            best[done] = current[done, choice]
+            best_length[done] = i - choice
+    return best, best_length, contained
+
+
+def verify_overlaps(reads: Sequence[str], candidates: Candidates, min_overlap: int = 30,
+                    max_error_rate: float = 0.12, band: int = 8, slack: int = 0,
+                    chunk: int = VERIFY_CHUNK) -> Alignments:
+    # Banded edit distance of the source's end against the target's start, around the candidate diagonal.
+    # x starts band bases before the expected target start, padded when that lies before the source,
+    # so the band stays centred on the diagonal.
+    codes, lengths = _read_codes(reads)
+    all_starts = candidates.diagonals - band
+    all_x_lengths = lengths[candidates.sources] - all_starts
+    order = np.argsort(-all_x_lengths, kind='stable')
+    overlap_lengths = np.zeros(len(order), dtype=np.int64)
+    errors = np.zeros(len(order), dtype=np.int64)
+    contained = np.zeros(len(order), dtype=bool)
+    for first in range(0, len(order), chunk):
+        pairs = order[first:first + chunk]
+        sources, targets = candidates.sources[pairs], candidates.targets[pairs]
+        starts, x_lengths = all_starts[pairs], all_x_lengths[pairs]
+        columns = np.arange(int(x_lengths.max(initial=0)))
+        positions = starts[:, None] + columns[None, :]
+        x = np.full((len(pairs), len(columns)), PAD + 1, dtype=np.uint8)
+        within = (positions >= 0) & (columns[None, :] < x_lengths[:, None])
+        x[within] = codes[sources[:, None], np.clip(positions, 0, codes.shape[1] - 1)][within]
+        best, best_length, inside = _banded_alignment(x, x_lengths, np.maximum(-starts, 0), codes[targets],
+                                                      lengths[targets], band)
+
+        # A target starting before the source is the opposite pair's business; the error budget
+        # would otherwise absorb a short overhang there
+        forward = candidates.diagonals[pairs] >= -slack
+        passed = forward & (best_length >= min_overlap) & (best <= max_error_rate * best_length)
+        overlap_lengths[pairs] = np.where(passed, best_length, 0)
+        errors[pairs] = np.where(passed, best, 0)
+        # Of two reads that fit inside each other only the later, or shorter, one is dropped,
+        # and a target reaching more than `slack` bases past the source end is an overlap, not a containment
+        target_lengths, source_lengths = lengths[targets], lengths[sources]
+        smaller = (target_lengths < source_lengths) | ((target_lengths == source_lengths) & (targets > sources))
+        fits = (inside <= max_error_rate * target_lengths) & (~passed | (inside <= best + slack))
+        contained[pairs] = forward & smaller & fits
+    return Alignments(overlap_lengths, errors, contained)
+
+
+def approximate_overlap_graph(reads: Sequence[str], min_overlap: int = 30, max_error_rate: float = 0.12,
+                              k: int = 15, window: int = 10, band: int = 8, min_shared: int = 2,
+                              max_candidates: int = 32, end_length: Optional[int] = None,
+                              slack: int = 0) -> OverlapGraph:
+    # Same graph as build_overlap_graph, but overlaps may differ by up to max_error_rate edits per base
+    # (two reads disagree at about twice the per-read error rate). Edge lengths count target bases,
+    # so greedy_contigs spells contigs unchanged.
+    distinct, read_index = distinct_reads(reads)
+    index = MinimizerIndex(distinct, k, window, end_length)
+    candidates = index.candidates(min_overlap, band, min_shared, max_candidates)
+    alignments = verify_overlaps(distinct, candidates, min_overlap, max_error_rate, band, slack)
+    contained = np.zeros(len(distinct), dtype=bool)
+    contained[candidates.targets[alignments.contained]] = True
+    edges = alignments.lengths > 0
+    return OverlapGraph(distinct, read_index, contained, candidates.sources[edges], candidates.targets[edges],
+                        alignments.lengths[edges])
+
+
+def edit_distance(a: str, b: str) -> int:
+    # Full Levenshtein distance, one array operation per row of a
+    codes_a = ENCODE_TABLE[np.frombuffer(a.encode('ascii'), dtype=np.uint8)]
+    codes_b = ENCODE_TABLE[np.frombuffer(b.encode('ascii'), dtype=np.uint8)]
+    columns = np.arange(len(b) + 1)
+    row = columns.copy()
+    for i, base in enumerate(codes_a.tolist(), start=1):
+        current = np.empty_like(row)
+        current[0] = i
+        current[1:] = np.minimum(row[:-1] + (codes_b != base), row[1:] + 1)
+        row = np.minimum.accumulate(current - columns) + columns
+    return int(row[-1])
@@ -0,0 +1,175 @@
+import csv
+import gzip
+import io
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from bioutils.fasta import GZIP_MAGIC, read_fasta_records
+from bioutils.melting import (DEFAULT_NA_CONC, DEFAULT_OLIGO_CONC, NN_ENTHALPY, NN_ENTROPY, nn_tm_from_sums,
+                              salt_adjusted_tm, terminal_corrections, wallace_tm)
+from bioutils.packed import AMBIGUOUS, ENCODE_TABLE
+
+SEQUENCE_COLUMNS = ('sequence', 'seq', 'oligo', 'primer')
+NAME_COLUMNS = ('name', 'id', 'oligo_id')
+NA_COLUMNS = ('na_conc', 'na')
+
+
+class OligoBatch:
+    # All oligos concatenated into one code buffer; oligo i is codes[offsets[i]:offsets[i + 1]]
+    def __init__(self, names: List[str], sequences: List[bytes], na_conc: Optional[np.ndarray] = None):
+        self.names = names
+        lengths = np.fromiter((len(sequence) for sequence in sequences), dtype=np.int64, count=len(sequences))
+        self.offsets = np.concatenate(([0], np.cumsum(lengths)))
+        self.codes = ENCODE_TABLE[np.frombuffer(b''.join(sequences), dtype=np.uint8)]
+        self.na_conc = na_conc
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+
+def _open_text(filename: str):
+    with open(filename, 'rb') as f:
+        compressed = f.read(2) == GZIP_MAGIC
+    if compressed:
+        return io.TextIOWrapper(gzip.open(filename, 'rb'), encoding='utf-8', newline='')
+    return open(filename, 'r', encoding='utf-8', newline='')
+
+
+def _find_column(header: List[str], options) -> Optional[int]:
+    lowered = [column.strip().lower() for column in header]
+    for option in options:
+        if option in lowered:
+            return lowered.index(option)
+    return None
+
+
+def read_oligos(filename: str) -> OligoBatch:
+    # FASTA (first character '>') or CSV with a sequence column; either may be gzip compressed.
+    # CSV files without a recognised header are read as name,sequence or sequence-only rows.
+    with _open_text(filename) as f:
+        first = f.read(1)
+    if first == '>':
+        names = []
+        sequences = []
+        for record_id, sequence in read_fasta_records(filename):
+            names.append(record_id)
+            sequences.append(sequence)
+        return OligoBatch(names, sequences)
+
+    names = []
+    sequences = []
+    na_values = []
+    with _open_text(filename) as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        sequence_column = _find_column(header, SEQUENCE_COLUMNS)
+        if sequence_column is None:
+            rows = [header]
+            sequence_column = 0 if len(header) == 1 else 1
+            name_column = None if len(header) == 1 else 0
+            na_column = None
+        else:
+            rows = []
+            name_column = _find_column(header, NAME_COLUMNS)
+            na_column = _find_column(header, NA_COLUMNS)
+
+        for row in _chain(rows, reader):
+            if not row or not row[sequence_column].strip():
+                continue
+            sequences.append(row[sequence_column].strip().upper().encode('ascii'))
+            names.append(row[name_column] if name_column is not None else f"oligo_{len(names) + 1}")
+            if na_column is not None:
+                na_values.append(float(row[na_column]))
+
+    return OligoBatch(names, sequences, np.array(na_values) if na_column is not None else None)
+
+
+def _chain(rows, reader):
+    yield from rows
+    yield from reader
+
+
+def _segment_sums(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    cumulative = np.concatenate(([0], np.cumsum(values)))
+    return cumulative[offsets[1:]] - cumulative[offsets[:-1]]
+
+
+def batch_tm(batch: OligoBatch, na_conc=None, mg_conc: float = 0.0, dntp_conc: float = 0.0,
+             oligo_conc: float = DEFAULT_OLIGO_CONC) -> Dict[str, np.ndarray]:
+    # One vectorized pass over the whole buffer. na_conc may be a scalar or one value per oligo;
+    # by default the per-oligo column from the CSV is used when present.
+    if na_conc is None:
+        na_conc = batch.na_conc if batch.na_conc is not None else DEFAULT_NA_CONC
+    codes = batch.codes
+    offsets = batch.offsets
+    lengths = batch.lengths
+    oligo_of = np.repeat(np.arange(len(batch)), lengths)
+
+    gc_count = _segment_sums((codes == 1) | (codes == 2), offsets)
+    at_count = _segment_sums((codes == 0) | (codes == 3), offsets)
+    ambiguous = _segment_sums(codes == AMBIGUOUS, offsets) > 0
+    safe_lengths = np.maximum(lengths, 1)
+
+    # Dinucleotide terms, excluding the pair that would join the last base of one oligo to the next
+    safe_codes = np.where(codes == AMBIGUOUS, 0, codes).astype(np.int64)
+    pairs = 4 * safe_codes[:-1] + safe_codes[1:]
+    inside = oligo_of[:-1] == oligo_of[1:]
+    pair_offsets = np.concatenate(([0], np.cumsum(np.maximum(lengths - 1, 0))))
+    delta_h = _segment_sums(NN_ENTHALPY[pairs[inside]], pair_offsets)
+    delta_s = _segment_sums(NN_ENTROPY[pairs[inside]], pair_offsets)
+
+    nonempty = lengths > 0
+    first = safe_codes[np.minimum(offsets[:-1], len(codes) - 1)] if len(codes) else np.zeros(len(batch), dtype=np.int64)
+    last = safe_codes[np.maximum(offsets[1:] - 1, 0)] if len(codes) else np.zeros(len(batch), dtype=np.int64)
+    terminal_h, terminal_s = terminal_corrections(first, last)
+
+    # Self-complementary when every base pairs with its mirror position
+    mirror = offsets[:-1][oligo_of] + offsets[1:][oligo_of] - 1 - np.arange(len(codes))
+    mismatches = _segment_sums(safe_codes != 3 - safe_codes[mirror], offsets)
+    symmetric = mismatches == 0
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        nearest_neighbor = nn_tm_from_sums(delta_h + terminal_h, delta_s + terminal_s, lengths, symmetric,
+                                           na_conc, mg_conc, dntp_conc, oligo_conc)
+        salt = salt_adjusted_tm(gc_count, safe_lengths, na_conc)
+    invalid = ambiguous | ~nonempty
+    nearest_neighbor = np.where(invalid | (lengths < 2), np.nan, nearest_neighbor)
+    salt = np.where(nonempty, salt, np.nan)
+
+    return {
+        'length': lengths,
+        'gc_percent': gc_count / safe_lengths * 100,
+        'tm_wallace': wallace_tm(gc_count, at_count),
+        'tm_salt_adjusted': salt,
+        'tm_nearest_neighbor': nearest_neighbor,
+    }
+
+
+def write_results(filename: str, batch: OligoBatch, results: Dict[str, np.ndarray]):
+    # .parquet goes through pandas (needs pyarrow or fastparquet), anything else is written as CSV
+    if filename.endswith('.parquet'):
+        import pandas as pd
+        frame = pd.DataFrame({'name': batch.names, **results})
+        frame.to_parquet(filename, index=False)
+        return
+
+    columns = list(results)
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['name'] + columns)
+        values = [np.round(results[column], 2) if results[column].dtype.kind == 'f' else results[column]
+                  for column in columns]
+        for name, *row in zip(batch.names, *[value.tolist() for value in values]):
+            writer.writerow([name] + row)
+
+
+def process_oligo_file(input_file: str, output_file: str, **conditions) -> Tuple[OligoBatch, Dict[str, np.ndarray]]:
+    batch = read_oligos(input_file)
+    results = batch_tm(batch, **conditions)
+    write_results(output_file, batch, results)
+    return batch, results
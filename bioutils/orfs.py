@@ -0,0 +1,87 @@
+from multiprocessing import Pool, cpu_count
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from bioutils.fasta import read_fasta_records
+from bioutils.kmers import encode_kmer
+from bioutils.packed import PackedSequence, as_packed
+from bioutils.translation import STOP, codon_indices, codon_table
+from bioutils.windows import SequenceLike
+
+DEFAULT_MIN_LENGTH = 100  # amino acids, stop codon excluded
+ORF_FIELDS = ('start', 'end', 'strand', 'frame', 'length')
+
+
+def _frame_orfs(packed: PackedSequence, frame: int, table: np.ndarray, start_codes: np.ndarray,
+                min_length: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Start and stop codons become index masks; searchsorted pairs each start with the next
+    # in-frame stop, and only the first (longest) start per stop is kept.
+    indices = codon_indices(packed, frame)
+    amino_acids = table[indices]
+    stops = np.flatnonzero(amino_acids == STOP)
+    starts = np.flatnonzero(np.isin(indices, start_codes))
+    following = np.searchsorted(stops, starts)
+    closed = following < len(stops)
+    starts = starts[closed]
+    ends = stops[following[closed]]
+    ends, first = np.unique(ends, return_index=True)
+    starts = starts[first]
+    keep = ends - starts >= min_length
+    return starts[keep], ends[keep], amino_acids
+
+
+def find_orfs(sequence: SequenceLike, min_length: int = DEFAULT_MIN_LENGTH, table_id: int = 1,
+              start_codons: Sequence[str] = ('ATG',)) -> Tuple[Dict[str, np.ndarray], List[str]]:
+    # ORFs on both strands and all three frames. Coordinates are 0-based half-open on the
+    # forward strand and include the stop codon; proteins exclude it.
+    packed = as_packed(sequence)
+    length = len(packed)
+    table = codon_table(table_id)
+    start_codes = np.array([encode_kmer(codon) for codon in start_codons])
+    columns = {field: [] for field in ORF_FIELDS}
+    proteins = []
+
+    for strand, strand_sequence in ((1, packed), (-1, packed.reverse_complement())):
+        for frame in range(3):
+            starts, ends, amino_acids = _frame_orfs(strand_sequence, frame, table, start_codes, min_length)
+            nucleotide_start = frame + 3 * starts
+            nucleotide_end = frame + 3 * (ends + 1)
+            if strand == -1:
+                nucleotide_start, nucleotide_end = length - nucleotide_end, length - nucleotide_start
+            columns['start'].append(nucleotide_start)
+            columns['end'].append(nucleotide_end)
+            columns['strand'].append(np.full(len(starts), strand, dtype=np.int8))
+            columns['frame'].append(np.full(len(starts), frame, dtype=np.int8))
+            columns['length'].append(ends - starts)
+            protein_bytes = amino_acids.tobytes()
+            proteins.extend(protein_bytes[s:e].decode('ascii') for s, e in zip(starts.tolist(), ends.tolist()))
+
+    orfs = {field: np.concatenate(values) for field, values in columns.items()}
+    order = np.lexsort((-orfs['strand'], orfs['start']))
+    orfs = {field: values[order] for field, values in orfs.items()}
+    return orfs, [proteins[i] for i in order]
+
+
+def _record_orfs(args):
+    record_id, sequence, options = args
+    orfs, proteins = find_orfs(sequence, **options)
+    return record_id, orfs, proteins
+
+
+def find_orfs_in_file(filename: str, processes: Optional[int] = None, **options):
+    # Records are independent, so each one is searched in its own worker process
+    tasks = ((record_id, sequence, options) for record_id, sequence in read_fasta_records(filename))
+    with Pool(processes or cpu_count()) as pool:
+        yield from pool.imap(_record_orfs, tasks)
+
+
+def write_orfs(record_id: str, orfs: Dict[str, np.ndarray], proteins: List[str], table_file, protein_file):
+    for i, protein in enumerate(proteins):
+        name = f"{record_id}_orf{i + 1}"
+        strand = '+' if orfs['strand'][i] == 1 else '-'
+        table_file.write(f"{name}\t{record_id}\t{orfs['start'][i] + 1}\t{orfs['end'][i]}\t{strand}\t"
+                         f"{orfs['frame'][i] + 1}\t{orfs['length'][i]}\n")
+        protein_file.write(f">{name} {record_id}:{orfs['start'][i] + 1}-{orfs['end'][i]}({strand})\n")
+        for j in range(0, len(protein), 60):
+            protein_file.write(protein[j:j + 60] + "\n")
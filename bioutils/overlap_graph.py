@@ -0,0 +1,180 @@
+from typing import List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from bioutils.packed import ENCODE_TABLE
+
+
+class OverlapGraph(NamedTuple):
+    reads: List[str]            # distinct reads, in order of first occurrence
+    read_index: np.ndarray      # position of each distinct read in the input
+    contained: np.ndarray       # distinct reads that are substrings of another read
+    sources: np.ndarray         # suffix of reads[sources[e]] ...
+    targets: np.ndarray         # ... equals the prefix of reads[targets[e]]
+    lengths: np.ndarray         # overlap length of edge e
+
+
+def distinct_reads(reads: Sequence[str]) -> Tuple[List[str], np.ndarray]:
+    # Non-empty reads with duplicates dropped, and the input position of each one's first copy
+    first = {}
+    for index, read in enumerate(reads):
+        if read and read not in first:
+            first[read] = index
+    return list(first), np.fromiter(first.values(), dtype=np.int64, count=len(first))
+
+
+def _concatenate(reads: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Read r is followed by separator r; separators sort before every base and are all different,
+    # so no common prefix ever runs across the end of a read
+    lengths = np.fromiter((len(read) for read in reads), dtype=np.int64, count=len(reads))
+    starts = np.concatenate(([0], np.cumsum(lengths + 1)[:-1])).astype(np.int64)
+    codes = ENCODE_TABLE[np.frombuffer("".join(reads).encode('ascii'), dtype=np.uint8)].astype(np.int64)
+    text = np.empty(int(lengths.sum()) + len(reads), dtype=np.int64)
+    separators = starts + lengths
+    is_base = np.ones(len(text), dtype=bool)
+    is_base[separators] = False
+    text[is_base] = codes + len(reads)
+    text[separators] = np.arange(len(reads))
+    return text, starts, lengths
+
+
+def suffix_array(text: np.ndarray) -> Tuple[np.ndarray, List[np.ndarray]]:
+    # Prefix doubling. Level t of the returned ranks orders prefixes of length 2**t,
+    # which is what the LCP computation below needs.
+    n = len(text)
+    rank_type = np.int32 if n < 2 ** 31 else np.int64
+    _, rank = np.unique(text, return_inverse=True)
+    rank = rank.astype(rank_type)
+    levels = [rank]
+    order = np.argsort(rank, kind='stable')
+    span = 1
+    while len(order) and rank[order[-1]] < n - 1:
+        following = np.zeros(n, dtype=np.int64)
+        following[:n - span] = rank[span:] + 1
+        # A single combined key sorts much faster than lexsort; ties need no particular order
+        keys = rank.astype(np.int64) * (n + 1) + following
+        order = np.argsort(keys)
+        sorted_keys = keys[order]
+        boundaries = np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1]))
+        rank = np.empty(n, dtype=rank_type)
+        rank[order] = np.cumsum(boundaries) - 1
+        levels.append(rank)
+        span *= 2
+    return order, levels
+
+
+def lcp_array(suffixes: np.ndarray, levels: List[np.ndarray]) -> np.ndarray:
+    # lcp[r] is the common prefix of the suffixes ranked r - 1 and r (lcp[0] = 0)
+    n = len(suffixes)
+    left, right = suffixes[:-1], suffixes[1:]
+    common = np.zeros(max(n - 1, 0), dtype=np.int64)
+    for level in range(len(levels) - 1, -1, -1):
+        a, b = left + common, right + common
+        valid = (a < n) & (b < n)
+        equal = np.zeros(len(common), dtype=bool)
+        equal[valid] = levels[level][a[valid]] == levels[level][b[valid]]
+        common += equal << level
+    return np.concatenate(([0], common))
+
+
+def _sparse_minimum(values: np.ndarray, floor: int) -> List[np.ndarray]:
+    # Range-minimum levels; once no window reaches `floor` no interval query can use a wider one
+    table = [values]
+    span = 1
+    while 2 * span <= len(values) and table[-1].max() >= floor:
+        previous = table[-1]
+        table.append(np.minimum(previous[:-span], previous[span:]))
+        span *= 2
+    return table
+
+
+def _interval(table: List[np.ndarray], ranks: np.ndarray, depth: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Widest SA interval [low, high] around each rank whose suffixes all share `depth` characters
+    n = len(table[0])
+    low, high = ranks.copy(), ranks.copy()
+    for level in range(len(table) - 1, -1, -1):
+        span = 1 << level
+        minimum = table[level]
+        last = len(minimum) - 1
+        high += span * ((high + 1 <= last) & (minimum[np.minimum(high + 1, last)] >= depth))
+        low -= span * ((low - span >= 0) & (minimum[np.maximum(low - span + 1, 0)] >= depth))
+    return low, high
+
+
+def build_overlap_graph(reads: Sequence[str], min_overlap: int = 30) -> OverlapGraph:
+    # Every proper suffix of a distinct read that is at least min_overlap long is located in the
+    # suffix array together with all read starts sharing it, giving all suffix-prefix overlaps at once
+    distinct, read_index = distinct_reads(reads)
+    text, starts, lengths = _concatenate(distinct)
+    suffixes, levels = suffix_array(text)
+    lcp = lcp_array(suffixes, levels).astype(np.min_scalar_type(int(lengths.max(initial=0))))
+    table = _sparse_minimum(lcp, min(max(min_overlap, 1), int(lengths.min(initial=1))))
+    rank = np.empty(len(text), dtype=np.int64)
+    rank[suffixes] = np.arange(len(text))
+    start_ranks = np.sort(rank[starts])
+    owner = np.empty(len(text), dtype=np.int64)
+    owner[rank[starts]] = np.arange(len(distinct))
+    start_owner = owner[start_ranks]
+
+    low, high = _interval(table, rank[starts], lengths)
+    contained = high > low
+
+    tails = np.maximum(lengths - np.maximum(min_overlap, 1), 0)
+    source_reads = np.repeat(np.arange(len(distinct)), tails)
+    offsets = np.arange(len(source_reads)) - np.repeat(np.cumsum(tails) - tails, tails)
+    positions = starts[source_reads] + 1 + offsets
+    # Only suffixes whose first min_overlap bases begin some read can have an edge
+    groups = np.cumsum(lcp < max(min_overlap, 1))
+    has_start = np.bincount(groups[start_ranks], minlength=groups[-1] + 1 if len(groups) else 0) > 0
+    useful = has_start[groups[rank[positions]]]
+    source_reads, positions = source_reads[useful], positions[useful]
+    depth = starts[source_reads] + lengths[source_reads] - positions
+    low, high = _interval(table, rank[positions], depth)
+    first = np.searchsorted(start_ranks, low, side='left')
+    last = np.searchsorted(start_ranks, high, side='right')
+    counts = last - first
+    edge_sources = np.repeat(source_reads, counts)
+    edge_lengths = np.repeat(depth, counts)
+    edge_slots = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(first, counts)
+    edge_targets = start_owner[edge_slots]
+    keep = edge_sources != edge_targets
+    return OverlapGraph(distinct, read_index, contained, edge_sources[keep], edge_targets[keep], edge_lengths[keep])
+
+
+def greedy_contigs(graph: OverlapGraph) -> List[str]:
+    # Classic greedy layout: accept overlaps longest first while each read keeps at most one
+    # successor and one predecessor and no cycle is closed; contained reads are left out
+    count = len(graph.reads)
+    keep = ~graph.contained[graph.sources] & ~graph.contained[graph.targets]
+    sources, targets, lengths = graph.sources[keep], graph.targets[keep], graph.lengths[keep]
+    order = np.lexsort((targets, sources, -lengths))
+    successor = np.full(count, -1, dtype=np.int64)
+    overlap = np.zeros(count, dtype=np.int64)
+    has_predecessor = np.zeros(count, dtype=bool)
+    chain = list(range(count))
+
+    def find(node):
+        while chain[node] != node:
+            chain[node] = chain[chain[node]]
+            node = chain[node]
+        return node
+
+    for source, target, length in zip(sources[order].tolist(), targets[order].tolist(), lengths[order].tolist()):
+        if successor[source] != -1 or has_predecessor[target]:
+            continue
+        source_chain, target_chain = find(source), find(target)
+        if source_chain == target_chain:
+            continue
+        chain[target_chain] = source_chain
+        successor[source] = target
+        overlap[source] = length
+        has_predecessor[target] = True
+
+    contigs = []
+    for node in np.flatnonzero(~has_predecessor & ~graph.contained):
+        parts = [graph.reads[node]]
+        while successor[node] != -1:
+            parts.append(graph.reads[successor[node]][overlap[node]:])
+            node = successor[node]
+        contigs.append("".join(parts))
+    return sorted(contigs, key=len, reverse=True)
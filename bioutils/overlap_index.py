@@ -0,0 +1,100 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class OverlapIndex:
+    # Every overlap of length k >= min_overlap starts with the read's first min_overlap bases
+    # (suffix extension) or ends with its last min_overlap bases (prefix extension), so those
+    # seeds are hashed once and each extension step is one dictionary lookup per overlap length.
+    def __init__(self, reads: Sequence[str], min_overlap: int = 30):
+        if min_overlap < 1:
+            raise ValueError("min_overlap must be positive")
+        self.reads = list(reads)
+        self.min_overlap = min_overlap
+        self.used = [False] * len(self.reads)
+        self.max_length = max((len(read) for read in self.reads), default=0)
+        self.prefix_seeds: Dict[str, List[int]] = defaultdict(list)
+        self.suffix_seeds: Dict[str, List[int]] = defaultdict(list)
+        for index, read in enumerate(self.reads):
+            if len(read) >= min_overlap:
+                self.prefix_seeds[read[:min_overlap]].append(index)
+                self.suffix_seeds[read[-min_overlap:]].append(index)
+
+    def mark_used(self, index: int):
+        self.used[index] = True
+
+    def remaining(self) -> int:
+        return self.used.count(False)
+
+    def _unused(self, seeds: Dict[str, List[int]], seed: str) -> List[int]:
+        candidates = seeds.get(seed)
+        if not candidates:
+            return []
+        if any(self.used[index] for index in candidates):
+            candidates[:] = [index for index in candidates if not self.used[index]]
+        return candidates
+
+    def best_suffix_overlap(self, tail: str) -> Tuple[int, int]:
+        # Longest overlap of a read's prefix with the end of `tail`; ties go to the lowest read index
+        end = len(tail)
+        for k in range(min(end, self.max_length), self.min_overlap - 1, -1):
+            start = end - k
+            candidates = self._unused(self.prefix_seeds, tail[start:start + self.min_overlap])
+            if not candidates:
+                continue
+            target = tail[start:]
+            for index in candidates:
+                if self.reads[index].startswith(target):
+                    return index, k
+        return -1, 0
+
+    def best_prefix_overlap(self, head: str) -> Tuple[int, int]:
+        # Longest overlap of a read's suffix with the start of `head`; ties go to the lowest read index
+        for k in range(min(len(head), self.max_length), self.min_overlap - 1, -1):
+            candidates = self._unused(self.suffix_seeds, head[k - self.min_overlap:k])
+            if not candidates:
+                continue
+            target = head[:k]
+            for index in candidates:
+                if self.reads[index].endswith(target):
+                    return index, k
+        return -1, 0
+
+
+def greedy_assemble(reads: Sequence[str], min_overlap: int = 30, seed_read: int = 0,
+                    index: Optional[OverlapIndex] = None) -> Tuple[str, int, int]:
+    # Extends `seed_read` to the right, then to the left, always taking the longest overlap.
+    # Returns the assembly and its length after the suffix phase (for reporting) and the unused read count.
+    if not reads:
+        return "", 0, 0
+    index = index or OverlapIndex(reads, min_overlap)
+    index.mark_used(seed_read)
+    window = max(index.max_length, 1)
+
+    suffix_parts = [reads[seed_read]]
+    tail = reads[seed_read][-window:]
+    length = len(reads[seed_read])
+    while True:
+        best, k = index.best_suffix_overlap(tail)
+        if best == -1:
+            break
+        index.mark_used(best)
+        extension = reads[best][k:]
+        suffix_parts.append(extension)
+        tail = (tail + extension)[-window:]
+        length += len(extension)
+    assembly = "".join(suffix_parts)
+    suffix_length = length
+
+    prefix_parts = []
+    head = assembly[:window]
+    while True:
+        best, k = index.best_prefix_overlap(head)
+        if best == -1:
+            break
+        index.mark_used(best)
+        extension = reads[best][:len(reads[best]) - k]
+        prefix_parts.append(extension)
+        head = (extension + head)[:window]
+    prefix_parts.reverse()
+    return "".join(prefix_parts) + assembly, suffix_length, index.remaining()
@@ -0,0 +1,124 @@
+from typing import Dict, Union
+
+import numpy as np
+
+BASES = 'ACGT'
+AMBIGUOUS = 4
+
+# ASCII byte -> 2-bit base code, anything outside ACGT/U becomes AMBIGUOUS
+ENCODE_TABLE = np.full(256, AMBIGUOUS, dtype=np.uint8)
+for _code, _base in enumerate(BASES):
+    ENCODE_TABLE[ord(_base)] = _code
+    ENCODE_TABLE[ord(_base.lower())] = _code
+ENCODE_TABLE[ord('U')] = ENCODE_TABLE[ord('u')] = 3
+
+DECODE_TABLE = np.frombuffer(BASES.encode('ascii'), dtype=np.uint8)
+
+
+class PackedSequence:
+    # Bases held as uint8 codes (A=0, C=1, G=2, T=3). Ambiguous bases are stored
+    # as code 0 plus a run-length mask (starts, lengths) and come back out as 'N'.
+    __slots__ = ('codes', 'mask_starts', 'mask_lengths')
+
+    def __init__(self, codes: np.ndarray, mask_starts: np.ndarray = None, mask_lengths: np.ndarray = None):
+        self.codes = codes
+        self.mask_starts = np.zeros(0, dtype=np.int64) if mask_starts is None else mask_starts
+        self.mask_lengths = np.zeros(0, dtype=np.int64) if mask_lengths is None else mask_lengths
+
+    @classmethod
+    def from_str(cls, sequence: Union[str, bytes]) -> 'PackedSequence':
+        if isinstance(sequence, str):
+            sequence = sequence.encode('ascii')
+        codes = ENCODE_TABLE[np.frombuffer(sequence, dtype=np.uint8)]
+        ambiguous = codes == AMBIGUOUS
+        if not ambiguous.any():
+            return cls(codes)
+        edges = np.diff(np.concatenate(([0], ambiguous.view(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        lengths = np.flatnonzero(edges == -1) - starts
+        codes[ambiguous] = 0
+        return cls(codes, starts.astype(np.int64), lengths.astype(np.int64))
+
+    @classmethod
+    def from_packed(cls, packed: np.ndarray, length: int, mask_starts: np.ndarray = None,
+                    mask_lengths: np.ndarray = None) -> 'PackedSequence':
+        shifts = np.array([6, 4, 2, 0], dtype=np.uint8)
+        codes = ((packed[:, None] >> shifts) & 3).astype(np.uint8).ravel()[:length]
+        return cls(codes, mask_starts, mask_lengths)
+
+    def pack(self) -> np.ndarray:
+        # Four bases per byte, first base in the high bits
+        padded = np.zeros(-(-len(self.codes) // 4) * 4, dtype=np.uint8)
+        padded[:len(self.codes)] = self.codes
+        quads = padded.reshape(-1, 4)
+        return (quads[:, 0] << 6) | (quads[:, 1] << 4) | (quads[:, 2] << 2) | quads[:, 3]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            raise TypeError("PackedSequence only supports slicing")
+        start, stop, step = item.indices(len(self.codes))
+        if step != 1:
+            raise ValueError("PackedSequence slices must be contiguous")
+        stop = max(start, stop)
+        run_ends = self.mask_starts + self.mask_lengths
+        keep = (run_ends > start) & (self.mask_starts < stop)
+        starts = np.maximum(self.mask_starts[keep], start)
+        ends = np.minimum(run_ends[keep], stop)
+        return PackedSequence(self.codes[start:stop], starts - start, ends - starts)
+
+    def __str__(self):
+        return self.to_bytes().decode('ascii')
+
+    def __repr__(self):
+        preview = str(self[:20]) + ('...' if len(self) > 20 else '')
+        return f"PackedSequence('{preview}', length={len(self)})"
+
+    def __eq__(self, other):
+        if not isinstance(other, PackedSequence):
+            return NotImplemented
+        return (np.array_equal(self.codes, other.codes)
+                and np.array_equal(self.mask_starts, other.mask_starts)
+                and np.array_equal(self.mask_lengths, other.mask_lengths))
+
+    def to_bytes(self) -> bytes:
+        letters = DECODE_TABLE[self.codes]
+        letters[self.ambiguous_mask()] = ord('N')
+        return letters.tobytes()
+
+    def ambiguous_mask(self) -> np.ndarray:
+        mask = np.zeros(len(self.codes), dtype=bool)
+        for start, length in zip(self.mask_starts, self.mask_lengths):
+            mask[start:start + length] = True
+        return mask
+
+    def valid_mask(self) -> np.ndarray:
+        return ~self.ambiguous_mask()
+
+    def reverse_complement(self) -> 'PackedSequence':
+        codes = 3 - self.codes[::-1]
+        starts = len(self.codes) - (self.mask_starts + self.mask_lengths)
+        return PackedSequence(codes, starts[::-1].copy(), self.mask_lengths[::-1].copy())
+
+    def base_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.codes[self.valid_mask()], minlength=4)
+        result = {base: int(count) for base, count in zip(BASES, counts)}
+        result['N'] = int(self.mask_lengths.sum())
+        return result
+
+    def gc_fraction(self) -> float:
+        counts = self.base_counts()
+        called = len(self.codes) - counts['N']
+        return (counts['G'] + counts['C']) / called if called else 0.0
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.mask_starts.nbytes + self.mask_lengths.nbytes
+
+
+def as_packed(sequence: Union[str, bytes, PackedSequence]) -> PackedSequence:
+    if isinstance(sequence, PackedSequence):
+        return sequence
+    return PackedSequence.from_str(sequence)
@@ -0,0 +1,165 @@
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from bioutils.fasta import read_fasta_records
+from bioutils.packed import as_packed
+from bioutils.translation import codon_indices, codon_table
+from bioutils.windows import SequenceLike
+
+AMINO_ACIDS = 'ACDEFGHIKLMNPQRSTVWY*X'
+SEPARATOR = 0  # between frames; never matches an amino acid
+BITS_PER_RESIDUE = 5
+DEFAULT_SEED = 5
+
+# ASCII -> 1..22, unknown letters map to X
+RESIDUE_CODES = np.full(256, AMINO_ACIDS.index('X') + 1, dtype=np.uint8)
+for _code, _letter in enumerate(AMINO_ACIDS, start=1):
+    RESIDUE_CODES[ord(_letter)] = _code
+    RESIDUE_CODES[ord(_letter.lower())] = _code
+RESIDUE_LETTERS = np.frombuffer(b'-' + AMINO_ACIDS.encode('ascii'), dtype=np.uint8)
+
+
+def _seed_codes(text: np.ndarray, k: int) -> np.ndarray:
+    total = len(text) - k + 1
+    codes = np.zeros(max(total, 0), dtype=np.uint64)
+    for offset in range(k):
+        codes <<= np.uint64(BITS_PER_RESIDUE)
+        codes |= text[offset:offset + total].astype(np.uint64)
+    return codes
+
+
+class PeptideIndex:
+    # Six-frame translated proteome of a genome set, concatenated into one residue array
+    # with separators, plus a sorted seed (amino-acid k-mer) index over every position.
+    def __init__(self, text, segment_starts, segment_records, segment_strands, segment_frames,
+                 record_names, record_lengths, seed_length, seed_codes, seed_positions, table_id=1):
+        self.text = text
+        self.segment_starts = segment_starts
+        self.segment_records = segment_records
+        self.segment_strands = segment_strands
+        self.segment_frames = segment_frames
+        self.record_names = list(record_names)
+        self.record_lengths = record_lengths
+        self.seed_length = seed_length
+        self.seed_codes = seed_codes
+        self.seed_positions = seed_positions
+        self.table_id = table_id  # genetic code the frames were translated with
+
+    @classmethod
+    def build(cls, records: Iterable[Tuple[str, SequenceLike]], table_id: int = 1,
+              seed_length: int = DEFAULT_SEED) -> 'PeptideIndex':
+        if not 1 <= seed_length <= 12:
+            raise ValueError("seed_length must be between 1 and 12")
+        table = codon_table(table_id)
+        pieces = []
+        starts, record_ids, strands, frames = [], [], [], []
+        names, lengths = [], []
+        position = 0
+        for record_index, (name, sequence) in enumerate(records):
+            packed = as_packed(sequence)
+            names.append(name)
+            lengths.append(len(packed))
+            for strand, strand_sequence in ((1, packed), (-1, packed.reverse_complement())):
+                for frame in range(3):
+                    residues = RESIDUE_CODES[table[codon_indices(strand_sequence, frame)]]
+                    starts.append(position)
+                    record_ids.append(record_index)
+                    strands.append(strand)
+                    frames.append(frame)
+                    pieces.append(residues)
+                    pieces.append(np.array([SEPARATOR], dtype=np.uint8))
+                    position += len(residues) + 1
+
+        text = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.uint8)
+        # Padding gives every position a seed, so pieces shorter than a seed can match up to the end
+        codes = _seed_codes(np.concatenate((text, np.zeros(seed_length - 1, dtype=np.uint8))), seed_length)
+        order = np.argsort(codes, kind='stable')
+        return cls(text, np.array(starts, dtype=np.int64), np.array(record_ids, dtype=np.int64),
+                   np.array(strands, dtype=np.int8), np.array(frames, dtype=np.int8),
+                   names, np.array(lengths, dtype=np.int64), seed_length, codes[order], order.astype(np.int64),
+                   table_id)
+
+    @classmethod
+    def from_fasta(cls, filenames: List[str], table_id: int = 1, seed_length: int = DEFAULT_SEED) -> 'PeptideIndex':
+        records = (record for filename in filenames for record in read_fasta_records(filename))
+        return cls.build(records, table_id, seed_length)
+
+    def save(self, path: str):
+        np.savez(path, text=self.text, segment_starts=self.segment_starts, segment_records=self.segment_records,
+                 segment_strands=self.segment_strands, segment_frames=self.segment_frames,
+                 record_names=np.array(self.record_names), record_lengths=self.record_lengths,
+                 seed_length=self.seed_length, seed_codes=self.seed_codes, seed_positions=self.seed_positions,
+                 table_id=self.table_id)
+
+    @classmethod
+    def load(cls, path: str) -> 'PeptideIndex':
+        # Indexes saved before the genetic code was stored get table_id None
+        with np.load(path) as data:
+            table_id = int(data['table_id']) if 'table_id' in data.files else None
+            return cls(data['text'], data['segment_starts'], data['segment_records'], data['segment_strands'],
+                       data['segment_frames'], data['record_names'].tolist(), data['record_lengths'],
+                       int(data['seed_length']), data['seed_codes'], data['seed_positions'], table_id)
+
+    def _seed_hits(self, piece: np.ndarray) -> np.ndarray:
+        # Seeds are sorted big-endian codes, so all seeds starting with a shorter piece form one range
+        length = min(len(piece), self.seed_length)
+        code = int(_seed_codes(piece[:length], length)[0])
+        shift = BITS_PER_RESIDUE * (self.seed_length - length)
+        low = np.searchsorted(self.seed_codes, np.uint64(code << shift), side='left')
+        high = np.searchsorted(self.seed_codes, np.uint64((code + 1) << shift), side='left')
+        return self.seed_positions[low:high]
+
+    def _candidates(self, query: np.ndarray, max_substitutions: int) -> np.ndarray:
+        # Pigeonhole: with at most N substitutions one of N + 1 pieces matches exactly.
+        # Pieces are looked up in the index (as a code range when shorter than a seed);
+        # only a query with fewer residues than pieces has to try every position.
+        pieces = max_substitutions + 1
+        piece_length = len(query) // pieces
+        if piece_length == 0:
+            return np.arange(max(len(self.text) - len(query) + 1, 0), dtype=np.int64)
+        candidates = []
+        for piece in range(pieces):
+            offset = piece * piece_length
+            hits = self._seed_hits(query[offset:offset + min(piece_length, self.seed_length)]) - offset
+            candidates.append(hits[(hits >= 0) & (hits + len(query) <= len(self.text))])
+        return np.unique(np.concatenate(candidates))
+
+    def search(self, peptide: str, max_substitutions: int = 0) -> List[Dict]:
+        query = RESIDUE_CODES[np.frombuffer(peptide.strip().upper().encode('ascii'), dtype=np.uint8)]
+        if len(query) == 0:
+            return []
+        candidates = self._candidates(query, max_substitutions)
+        hits = []
+        step = max(1, 4_000_000 // len(query))  # verify in blocks to bound memory
+        offsets = np.arange(len(query))
+        for block in range(0, len(candidates), step):
+            positions = candidates[block:block + step]
+            windows = self.text[positions[:, None] + offsets]
+            mismatches = (windows != query).sum(axis=1)
+            valid = (mismatches <= max_substitutions) & (windows != SEPARATOR).all(axis=1)
+            for position, count in zip(positions[valid], mismatches[valid]):
+                hits.append(self._describe(int(position), len(query), int(count)))
+        return hits
+
+    def _describe(self, position: int, length: int, substitutions: int) -> Dict:
+        segment = np.searchsorted(self.segment_starts, position, side='right') - 1
+        offset = position - self.segment_starts[segment]
+        frame = int(self.segment_frames[segment])
+        strand = int(self.segment_strands[segment])
+        record = int(self.segment_records[segment])
+        start = frame + 3 * offset
+        end = start + 3 * length
+        if strand == -1:
+            record_length = int(self.record_lengths[record])
+            start, end = record_length - end, record_length - start
+        matched = RESIDUE_LETTERS[self.text[position:position + length]].tobytes().decode('ascii')
+        return {
+            'record': self.record_names[record],
+            'start': int(start),
+            'end': int(end),
+            'strand': strand,
+            'frame': frame + 1,
+            'peptide': matched,
+            'substitutions': substitutions,
+        }
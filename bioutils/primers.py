@@ -0,0 +1,195 @@
+from multiprocessing import Pool, cpu_count
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from bioutils.melting import DEFAULT_NA_CONC, nn_tm_profile, salt_adjusted_tm, wallace_tm
+from bioutils.packed import PackedSequence, as_packed
+from bioutils.windows import SequenceLike, window_composition
+
+TM_METHODS = ('wallace', 'salt', 'nn')
+CHUNK_BASES = 1 << 20
+FORWARD = 1
+REVERSE = -1
+
+CANDIDATE_FIELDS = ('start', 'length', 'strand', 'tm', 'gc')
+
+
+def _empty_candidates() -> Dict[str, np.ndarray]:
+    return {
+        'start': np.zeros(0, dtype=np.int64),
+        'length': np.zeros(0, dtype=np.int64),
+        'strand': np.zeros(0, dtype=np.int8),
+        'tm': np.zeros(0),
+        'gc': np.zeros(0),
+    }
+
+
+def _concat_candidates(parts) -> Dict[str, np.ndarray]:
+    parts = list(parts)
+    if not parts:
+        return _empty_candidates()
+    return {field: np.concatenate([part[field] for part in parts]) for field in CANDIDATE_FIELDS}
+
+
+def _homopolymer_free(codes: np.ndarray, starts: np.ndarray, length: int, max_homopolymer: int) -> np.ndarray:
+    # A window fails if some j in [start + m, start + length) ends a run longer than m
+    n = len(codes)
+    same = np.concatenate(([False], codes[1:] == codes[:-1]))
+    run_start = np.maximum.accumulate(np.where(~same, np.arange(n), 0))
+    too_long = (np.arange(n) - run_start + 1) > max_homopolymer
+    bad = np.concatenate(([0], np.cumsum(too_long, dtype=np.int64)))
+    first = starts + max_homopolymer
+    return bad[starts + length] - bad[np.minimum(first, starts + length)] == 0
+
+
+def window_tm(sequence: SequenceLike, length: int, gc_count: np.ndarray, at_count: np.ndarray,
+              method: str = 'salt', na_conc: float = DEFAULT_NA_CONC, **nn_options) -> np.ndarray:
+    if method == 'wallace':
+        return wallace_tm(gc_count, at_count).astype(np.float64)
+    if method == 'salt':
+        return salt_adjusted_tm(gc_count, length, na_conc)
+    if method == 'nn':
+        return nn_tm_profile(sequence, length, 1, na_conc, **nn_options)[1]
+    raise ValueError(f"method must be one of {TM_METHODS}, got {method}")
+
+
+def find_primer_candidates(sequence: SequenceLike, min_length: int = 18, max_length: int = 25,
+                           tm_range: Tuple[float, float] = (52.0, 62.0), gc_range: Tuple[float, float] = (40.0, 60.0),
+                           gc_clamp: bool = True, max_homopolymer: int = 4, method: str = 'salt',
+                           na_conc: float = DEFAULT_NA_CONC, offset: int = 0, limit: Optional[int] = None,
+                           **nn_options) -> Dict[str, np.ndarray]:
+    # Every oligo of every length in the range is scored with window statistics, on both strands.
+    # Reverse primers are reported by the forward-strand window they anneal to.
+    packed = as_packed(sequence)
+    codes = packed.codes
+    limit = len(codes) if limit is None else limit
+    parts = []
+    for length in range(min_length, max_length + 1):
+        starts, counts = window_composition(packed, length, 1, 'ACGT', relative=False)
+        if len(starts) == 0:
+            continue
+        keep = starts < limit
+        gc_count = counts[1] + counts[2]
+        at_count = counts[0] + counts[3]
+        keep &= gc_count + at_count == length  # no ambiguous bases
+        gc_percent = gc_count / length * 100
+        keep &= (gc_percent >= gc_range[0]) & (gc_percent <= gc_range[1])
+        tm = window_tm(packed, length, gc_count, at_count, method, na_conc, **nn_options)
+        keep &= (tm >= tm_range[0]) & (tm <= tm_range[1])
+        if max_homopolymer:
+            keep &= _homopolymer_free(codes, starts, length, max_homopolymer)
+
+        strands = [(FORWARD, keep)]
+        if gc_clamp:
+            # 3' end is the last base for forward primers and the first base (complemented) for reverse ones
+            last = codes[starts + length - 1]
+            first = codes[starts]
+            strands = [(FORWARD, keep & ((last == 1) | (last == 2))),
+                       (REVERSE, keep & ((first == 1) | (first == 2)))]
+        else:
+            strands.append((REVERSE, keep))
+
+        for strand, mask in strands:
+            index = np.flatnonzero(mask)
+            parts.append({
+                'start': starts[index] + offset,
+                'length': np.full(len(index), length, dtype=np.int64),
+                'strand': np.full(len(index), strand, dtype=np.int8),
+                'tm': tm[index],
+                'gc': gc_percent[index],
+            })
+    return _concat_candidates(parts)
+
+
+def _search_chunk(args) -> Dict[str, np.ndarray]:
+    chunk, offset, limit, criteria = args
+    return find_primer_candidates(chunk, offset=offset, limit=limit, **criteria)
+
+
+def find_primers_parallel(sequence: SequenceLike, processes: Optional[int] = None, chunk_bases: int = CHUNK_BASES,
+                          **criteria) -> Dict[str, np.ndarray]:
+    # Chunks overlap by max_length - 1 bases; each chunk only reports oligos starting in its own range
+    packed = as_packed(sequence)
+    overlap = criteria.get('max_length', 25) - 1
+    tasks = []
+    for start in range(0, len(packed), chunk_bases):
+        chunk = packed[start:start + chunk_bases + overlap]
+        tasks.append((PackedSequence(chunk.codes.copy(), chunk.mask_starts, chunk.mask_lengths),
+                      start, chunk_bases, criteria))
+    if len(tasks) <= 1:
+        return _concat_candidates(_search_chunk(task) for task in tasks)
+    with Pool(processes or cpu_count()) as pool:
+        return _concat_candidates(pool.map(_search_chunk, tasks))
+
+
+def thin_candidates(candidates: Dict[str, np.ndarray], spacing: int = 50,
+                    target_tm: Optional[float] = None) -> Dict[str, np.ndarray]:
+    # Keeps the candidate closest to target_tm in every spacing-bp bin per strand,
+    # which bounds the pairing work while still covering the whole genome
+    if len(candidates['start']) == 0:
+        return candidates
+    if target_tm is None:
+        target_tm = float(np.median(candidates['tm']))
+    bins = candidates['start'] // spacing
+    distance = np.abs(candidates['tm'] - target_tm)
+    order = np.lexsort((distance, bins, candidates['strand']))
+    keys = np.stack((candidates['strand'][order], bins[order]))
+    first = np.concatenate(([True], np.any(keys[:, 1:] != keys[:, :-1], axis=0)))
+    chosen = np.sort(order[first])
+    return {field: candidates[field][chosen] for field in CANDIDATE_FIELDS}
+
+
+def pair_primers(candidates: Dict[str, np.ndarray], product_range: Tuple[int, int] = (100, 1000),
+                 max_tm_difference: float = 2.0, pairs_per_primer: int = 1) -> Dict[str, np.ndarray]:
+    # For each forward primer, the reverse primers whose product size fits are found with
+    # searchsorted on reverse end positions; the closest Tm matches are kept.
+    forward = np.flatnonzero(candidates['strand'] == FORWARD)
+    reverse = np.flatnonzero(candidates['strand'] == REVERSE)
+    reverse_end = candidates['start'][reverse] + candidates['length'][reverse]
+    order = np.argsort(reverse_end, kind='stable')
+    reverse = reverse[order]
+    reverse_end = reverse_end[order]
+
+    forward_start = candidates['start'][forward]
+    low = np.searchsorted(reverse_end, forward_start + product_range[0], side='left')
+    high = np.searchsorted(reverse_end, forward_start + product_range[1], side='right')
+
+    pairs_forward = []
+    pairs_reverse = []
+    for f, lo, hi in zip(forward, low, high):
+        if lo >= hi:
+            continue
+        options = reverse[lo:hi]
+        difference = np.abs(candidates['tm'][options] - candidates['tm'][f])
+        options = options[difference <= max_tm_difference]
+        if len(options) == 0:
+            continue
+        best = options[np.argsort(difference[difference <= max_tm_difference], kind='stable')[:pairs_per_primer]]
+        pairs_forward.append(np.full(len(best), f))
+        pairs_reverse.append(best)
+
+    if not pairs_forward:
+        pairs_forward = pairs_reverse = [np.zeros(0, dtype=np.int64)]
+    pairs_forward = np.concatenate(pairs_forward)
+    pairs_reverse = np.concatenate(pairs_reverse)
+    order = np.argsort(candidates['start'][pairs_forward], kind='stable')
+    pairs_forward = pairs_forward[order]
+    pairs_reverse = pairs_reverse[order]
+    return {
+        'forward_start': candidates['start'][pairs_forward],
+        'forward_length': candidates['length'][pairs_forward],
+        'forward_tm': candidates['tm'][pairs_forward],
+        'reverse_start': candidates['start'][pairs_reverse],
+        'reverse_length': candidates['length'][pairs_reverse],
+        'reverse_tm': candidates['tm'][pairs_reverse],
+        'product_size': (candidates['start'][pairs_reverse] + candidates['length'][pairs_reverse]
+                         - candidates['start'][pairs_forward]),
+    }
+
+
+def primer_sequence(sequence: SequenceLike, start: int, length: int, strand: int) -> str:
+    oligo = as_packed(sequence)[start:start + length]
+    if strand == REVERSE:
+        oligo = oligo.reverse_complement()
+    return str(oligo)
@@ -0,0 +1,194 @@
+from typing import Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+import numpy as np
+
+from bioutils.packed import AMBIGUOUS, BASES, as_packed
+from bioutils.windows import SequenceLike
+
+CHUNK_READS = 100_000
+PHRED_OFFSET = 33
+MAX_QUALITY = 41
+ERROR_QUALITY = 2  # bases created by a simulated error
+INDEL_SLACK_SD = 6
+
+# Read codes include AMBIGUOUS, which is written out as 'N' and is its own complement
+READ_DECODE_TABLE = np.frombuffer((BASES + 'N').encode('ascii'), dtype=np.uint8)
+COMPLEMENT_TABLE = np.array([3, 2, 1, 0, AMBIGUOUS], dtype=np.uint8)
+
+
+class ErrorModel(NamedTuple):
+    # Per-base probabilities; insertions are drawn before each template base
+    substitution: float = 0.0
+    insertion: float = 0.0
+    deletion: float = 0.0
+
+    def quality(self) -> int:
+        total = self.substitution + self.insertion + self.deletion
+        if total <= 0:
+            return MAX_QUALITY
+        return int(np.clip(np.floor(-10 * np.log10(total)), ERROR_QUALITY, MAX_QUALITY))
+
+
+class ReadBatch(NamedTuple):
+    codes: np.ndarray       # base codes of all reads back to back, AMBIGUOUS for N
+    qualities: np.ndarray   # Phred scores, aligned with codes
+    offsets: np.ndarray     # read i is codes[offsets[i]:offsets[i + 1]]
+    starts: np.ndarray      # forward-strand start; a reverse read's 5' end is at start + length - 1
+    strands: np.ndarray     # 1 forward, -1 reverse complement
+
+    def __len__(self):
+        return len(self.starts)
+
+    def sequences(self) -> List[str]:
+        text = READ_DECODE_TABLE[self.codes].tobytes().decode('ascii')
+        return [text[a:b] for a, b in zip(self.offsets[:-1].tolist(), self.offsets[1:].tolist())]
+
+
+def _segment_offsets(lengths: np.ndarray) -> np.ndarray:
+    return np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+
+
+def _within(lengths: np.ndarray) -> np.ndarray:
+    # Position of every element inside its segment
+    offsets = _segment_offsets(lengths)
+    return np.arange(offsets[-1]) - np.repeat(offsets[:-1], lengths)
+
+
+def _events(size: int, rate: float, rng: np.random.Generator) -> np.ndarray:
+    # Sorted positions hit by a Bernoulli(rate) process, drawn as geometric gaps so the
+    # cost follows the number of errors rather than the number of bases
+    if rate <= 0 or size == 0:
+        return np.zeros(0, dtype=np.int64)
+    expected = size * rate
+    positions = np.cumsum(rng.geometric(rate, int(expected + 6 * np.sqrt(expected) + 16))) - 1
+    while positions[-1] < size:
+        more = np.cumsum(rng.geometric(rate, int(expected / 4) + 16)) + positions[-1]
+        positions = np.concatenate((positions, more))
+    return positions[positions < size]
+
+
+def _sequence_reads(genome: np.ndarray, starts: np.ndarray, lengths: np.ndarray, reverse: np.ndarray,
+                    errors: ErrorModel, rng: np.random.Generator) -> ReadBatch:
+    # Template bases may be substituted, deleted or preceded by an inserted base;
+    # each read is then cut back to its requested length from its 3' end, so the 5' end stays
+    # at starts for forward reads and at starts + lengths - 1 for reverse ones. The slack for
+    # deletions is therefore taken downstream of forward reads and upstream of reverse ones.
+    ends = starts + lengths
+    slack = lengths + _indel_slack(lengths, errors)
+    spans = np.where(reverse, np.minimum(slack, ends), np.minimum(slack, len(genome) - starts))
+    template_starts = np.where(reverse, ends - spans, starts)
+    span_offsets = _segment_offsets(spans)
+    codes = genome[np.repeat(template_starts, spans) + _within(spans)]
+    qualities = np.full(len(codes), errors.quality(), dtype=np.uint8)
+    qualities[codes == AMBIGUOUS] = ERROR_QUALITY
+
+    substituted = _events(len(codes), errors.substitution, rng)
+    substituted = substituted[codes[substituted] != AMBIGUOUS]
+    codes[substituted] = (codes[substituted] + rng.integers(1, 4, len(substituted))) % 4
+    qualities[substituted] = ERROR_QUALITY
+    inserted = _events(len(codes), errors.insertion, rng)
+    deleted = _events(len(codes), errors.deletion, rng)
+
+    emitted = (spans + np.bincount(np.searchsorted(span_offsets, inserted, side='right') - 1, minlength=len(spans))
+               - np.bincount(np.searchsorted(span_offsets, deleted, side='right') - 1, minlength=len(spans)))
+    if len(inserted):
+        codes = np.insert(codes, inserted, rng.integers(0, 4, len(inserted)).astype(np.uint8))
+        qualities = np.insert(qualities, inserted, ERROR_QUALITY)
+    if len(deleted):
+        shifted = deleted + np.searchsorted(inserted, deleted, side='right')
+        codes = np.delete(codes, shifted)
+        qualities = np.delete(qualities, shifted)
+
+    # One gather trims every read and reverses the reverse-strand ones, read back from their last base
+    read_lengths = np.minimum(lengths, emitted)
+    first = _segment_offsets(emitted)[:-1] + np.where(reverse, emitted - 1, 0)
+    step = np.where(reverse, -1, 1)
+    source = np.repeat(first, read_lengths) + np.repeat(step, read_lengths) * _within(read_lengths)
+    codes, qualities = codes[source], qualities[source]
+    if reverse.all():
+        codes = COMPLEMENT_TABLE[codes]
+    elif reverse.any():
+        flip = np.repeat(reverse, read_lengths)
+        codes[flip] = COMPLEMENT_TABLE[codes[flip]]
+    read_starts = np.where(reverse, ends - read_lengths, starts)
+    return ReadBatch(codes, qualities, _segment_offsets(read_lengths), read_starts, step.astype(np.int8))
+
+
+def _indel_slack(lengths: np.ndarray, errors: ErrorModel) -> np.ndarray:
+    # Extra template so deletions rarely leave a read short
+    if not errors.deletion:
+        return np.zeros(len(lengths), dtype=np.int64)
+    expected = lengths * errors.deletion
+    return np.ceil(expected + INDEL_SLACK_SD * np.sqrt(expected) + 1).astype(np.int64)
+
+
+def _genome_codes(genome: SequenceLike) -> np.ndarray:
+    # Base codes with the N mask folded in, so reads over N runs carry N rather than A
+    packed = as_packed(genome)
+    if not len(packed.mask_starts):
+        return packed.codes
+    codes = packed.codes.copy()
+    codes[packed.ambiguous_mask()] = AMBIGUOUS
+    return codes
+
+
+def simulate_reads(genome: SequenceLike, num_reads: int, min_len: int = 100, max_len: int = 150,
+                   errors: ErrorModel = ErrorModel(), both_strands: bool = False,
+                   chunk_reads: int = CHUNK_READS, seed: Optional[int] = None) -> Iterator[ReadBatch]:
+    # Single-end reads with uniform start positions and lengths, generated chunk by chunk
+    codes = _genome_codes(genome)
+    rng = np.random.default_rng(seed)
+    for first in range(0, num_reads, chunk_reads):
+        count = min(chunk_reads, num_reads - first)
+        lengths = np.minimum(rng.integers(min_len, max_len + 1, count), len(codes))
+        starts = rng.integers(0, len(codes) - lengths + 1)
+        reverse = rng.random(count) < 0.5 if both_strands else np.zeros(count, dtype=bool)
+        yield _sequence_reads(codes, starts, lengths, reverse, errors, rng)
+
+
+def simulate_pairs(genome: SequenceLike, num_pairs: int, read_length: int = 150, insert_mean: float = 400,
+                   insert_sd: float = 50, errors: ErrorModel = ErrorModel(), chunk_reads: int = CHUNK_READS,
+                   seed: Optional[int] = None) -> Iterator[Tuple[ReadBatch, ReadBatch]]:
+    # Read 1 is the forward start of each fragment, read 2 the reverse complement of its end
+    codes = _genome_codes(genome)
+    rng = np.random.default_rng(seed)
+    read_length = min(read_length, len(codes))
+    for first in range(0, num_pairs, chunk_reads):
+        count = min(chunk_reads, num_pairs - first)
+        fragments = np.rint(rng.normal(insert_mean, insert_sd, count)).astype(np.int64)
+        fragments = np.clip(fragments, read_length, len(codes))
+        starts = rng.integers(0, len(codes) - fragments + 1)
+        lengths = np.full(count, read_length, dtype=np.int64)
+        forward = _sequence_reads(codes, starts, lengths, np.zeros(count, dtype=bool), errors, rng)
+        mates = _sequence_reads(codes, starts + fragments - read_length, lengths, np.ones(count, dtype=bool),
+                                errors, rng)
+        yield forward, mates
+
+
+def write_fastq(handle: TextIO, batch: ReadBatch, first_index: int = 0, prefix: str = 'read', suffix: str = ''):
+    sequences = batch.sequences()
+    qualities = (batch.qualities + PHRED_OFFSET).tobytes().decode('ascii')
+    offsets = batch.offsets.tolist()
+    handle.write("".join(
+        f"@{prefix}{first_index + i}{suffix} start={start} strand={'+' if strand == 1 else '-'}\n"
+        f"{sequence}\n+\n{qualities[offsets[i]:offsets[i + 1]]}\n"
+        for i, (sequence, start, strand) in enumerate(zip(sequences, batch.starts.tolist(), batch.strands.tolist()))
+    ))
+
+
+def simulate_fastq(genome: SequenceLike, path: str, num_reads: int, mate_path: Optional[str] = None,
+                   errors: ErrorModel = ErrorModel(), seed: Optional[int] = None, **options) -> int:
+    # Streams reads to FASTQ; with mate_path, num_reads pairs are written to path and mate_path
+    written = 0
+    if mate_path is None:
+        with open(path, 'w') as handle:
+            for batch in simulate_reads(genome, num_reads, errors=errors, seed=seed, **options):
+                write_fastq(handle, batch, written)
+                written += len(batch)
+        return written
+    with open(path, 'w') as first, open(mate_path, 'w') as second:
+        for forward, mates in simulate_pairs(genome, num_reads, errors=errors, seed=seed, **options):
+            write_fastq(first, forward, written, suffix='/1')
+            write_fastq(second, mates, written, suffix='/2')
+            written += len(forward)
+    return written
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Callable, Dict, Optional, Union
+
+import numpy as np
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = os.environ.get('BIOUTILS_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'bioutils'))
+DEFAULT_MAX_BYTES = 512 << 20
+HASH_CHUNK = 1 << 20
+ARRAY_KEY = '__array__'
+
+# (path, size, mtime_ns) -> sha256, so a file is only hashed once per process
+_file_digests: Dict[tuple, str] = {}
+
+
+def file_digest(path: str) -> str:
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _file_digests:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_CHUNK), b''):
+                digest.update(block)
+        _file_digests[memo_key] = digest.hexdigest()
+    return _file_digests[memo_key]
+
+
+def content_digest(data: Union[str, bytes]) -> str:
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def cache_key(source_digest: str, analysis: str, params: Optional[dict] = None) -> str:
+    description = json.dumps({'version': CACHE_VERSION, 'source': source_digest, 'analysis': analysis,
+                              'params': params or {}}, sort_keys=True, default=str)
+    return hashlib.sha256(description.encode('utf-8')).hexdigest()
+
+
+def _is_array_result(value: Any) -> bool:
+    if isinstance(value, np.ndarray):
+        return True
+    return isinstance(value, dict) and bool(value) and all(
+        isinstance(name, str) and isinstance(item, np.ndarray) for name, item in value.items())
+
+
+class ResultCache:
+    # Arrays (or dicts of arrays) are stored as .npz, everything else as JSON.
+    # Entry mtimes double as access times, so the oldest are evicted first once max_bytes is exceeded.
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._estimated_bytes = None  # running total, so puts only rescan the directory when over budget
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str, extension: str) -> str:
+        return os.path.join(self.directory, key + extension)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        for extension in ('.npz', '.json'):
+            path = self._path(key, extension)
+            try:
+                if extension == '.npz':
+                    with np.load(path) as data:
+                        value = data[ARRAY_KEY] if ARRAY_KEY in data.files else {name: data[name] for name in data.files}
+                else:
+                    with open(path, 'r') as f:
+                        value = json.load(f)
+            except (FileNotFoundError, ValueError, OSError):
+                continue
+            os.utime(path)
+            self.hits += 1
+            return value
+        self.misses += 1
+        return default
+
+    def put(self, key: str, value: Any):
+        extension = '.npz' if _is_array_result(value) else '.json'
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as f:
+                if extension == '.npz':
+                    arrays = {ARRAY_KEY: value} if isinstance(value, np.ndarray) else value
+                    np.savez(f, **arrays)
+                else:
+                    f.write(json.dumps(value).encode('utf-8'))
+            os.replace(temp_path, self._path(key, extension))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        if self._estimated_bytes is None:
+            self._estimated_bytes = sum(size for _, size, _ in self._entries())
+        else:
+            self._estimated_bytes += os.path.getsize(self._path(key, extension))
+        if self._estimated_bytes > self.max_bytes:
+            self.evict()
+
+    def cached(self, source_digest: str, analysis: str, params: Optional[dict], compute: Callable[[], Any]) -> Any:
+        key = cache_key(source_digest, analysis, params)
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(('.npz', '.json')):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue  # removed by another process
+            entries.append((stat.st_mtime, stat.st_size, name))
+        return entries
+
+    def evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._estimated_bytes = total
+
+    def clear(self):
+        for _, _, name in self._entries():
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+        self._estimated_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._entries()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+        }
+
+    def summary(self) -> str:
+        stats = self.stats()
+        return (f"Cache: {stats['hits']} hit(s), {stats['misses']} miss(es), "
+                f"{stats['entries']} entries using {stats['bytes'] / (1 << 20):.1f} MB in {self.directory}")
@@ -0,0 +1,149 @@
+import math
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from bioutils.fasta import read_fasta_chunks
+from bioutils.kmer_stream import CHUNK_BASES
+from bioutils.kmers import canonical_codes, kmer_codes
+
+
+def splitmix64(values: np.ndarray) -> np.ndarray:
+    z = values.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    # Exact bit length of uint64 values, split in halves so the float conversion stays exact
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+
+
+class CountMinSketch:
+    # Overestimates each count by at most epsilon * total with probability 1 - delta
+    def __init__(self, epsilon: float = 1e-4, delta: float = 0.01, seed: int = 0):
+        self.epsilon = epsilon
+        self.delta = delta
+        self.seed = seed
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.table = np.zeros((self.depth, self.width), dtype=np.int64)
+        self.total = 0
+        self._row_seeds = splitmix64(np.arange(self.depth, dtype=np.uint64) + np.uint64(seed))
+
+    def _columns(self, codes: np.ndarray, row: int) -> np.ndarray:
+        return (splitmix64(codes ^ self._row_seeds[row]) % np.uint64(self.width)).astype(np.int64)
+
+    def add(self, codes: np.ndarray, counts: Optional[np.ndarray] = None):
+        codes = np.asarray(codes, dtype=np.uint64)
+        weights = None if counts is None else np.asarray(counts, dtype=np.float64)
+        for row in range(self.depth):
+            added = np.bincount(self._columns(codes, row), weights=weights, minlength=self.width)
+            self.table[row] += added.astype(np.int64)
+        self.total += len(codes) if counts is None else int(np.sum(counts))
+
+    def query(self, codes: np.ndarray) -> np.ndarray:
+        codes = np.asarray(codes, dtype=np.uint64)
+        estimates = np.full(len(codes), np.iinfo(np.int64).max, dtype=np.int64)
+        for row in range(self.depth):
+            estimates = np.minimum(estimates, self.table[row, self._columns(codes, row)])
+        return estimates
+
+    def error_bound(self) -> float:
+        return self.epsilon * self.total
+
+    def merge(self, other: 'CountMinSketch'):
+        if (self.width, self.depth, self.seed) != (other.width, other.depth, other.seed):
+            raise ValueError("Only sketches built with the same epsilon, delta and seed can be merged")
+        self.table += other.table
+        self.total += other.total
+
+    def save(self, path: str):
+        np.savez(path, kind='cms', table=self.table, total=self.total,
+                 params=np.array([self.epsilon, self.delta, self.seed]))
+
+    @classmethod
+    def load(cls, path: str) -> 'CountMinSketch':
+        with np.load(path) as data:
+            epsilon, delta, seed = data['params']
+            sketch = cls(float(epsilon), float(delta), int(seed))
+            sketch.table = data['table']
+            sketch.total = int(data['total'])
+        return sketch
+
+
+class HyperLogLog:
+    # Distinct-count estimate with relative standard error of about 1.04 / sqrt(2^precision)
+    def __init__(self, error: float = 0.01, seed: int = 0):
+        self.precision = min(max(math.ceil(math.log2((1.04 / error) ** 2)), 4), 18)
+        self.error = 1.04 / math.sqrt(1 << self.precision)
+        self.seed = seed
+        self.registers = np.zeros(1 << self.precision, dtype=np.uint8)
+
+    def add(self, codes: np.ndarray):
+        hashes = splitmix64(np.asarray(codes, dtype=np.uint64) ^ np.uint64(self.seed))
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        rest = hashes << np.uint64(self.precision)
+        rank = np.minimum(65 - _bit_length(rest), 64 - self.precision + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def cardinality(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)
+        return float(estimate)
+
+    def merge(self, other: 'HyperLogLog'):
+        if (self.precision, self.seed) != (other.precision, other.seed):
+            raise ValueError("Only sketches built with the same error and seed can be merged")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def save(self, path: str):
+        np.savez(path, kind='hll', registers=self.registers, params=np.array([self.error, self.seed]))
+
+    @classmethod
+    def load(cls, path: str) -> 'HyperLogLog':
+        with np.load(path) as data:
+            error, seed = data['params']
+            sketch = cls(float(error), int(seed))
+            sketch.registers = data['registers']
+        return sketch
+
+
+def sketch_fasta(filename: str, k: int, canonical: bool = False, epsilon: float = 1e-4, delta: float = 0.01,
+                 hll_error: float = 0.01, chunk_bases: int = CHUNK_BASES) -> Tuple[CountMinSketch, HyperLogLog]:
+    # Streams the file once; memory is fixed by the sketch parameters, not by the genome
+    cms = CountMinSketch(epsilon, delta)
+    hll = HyperLogLog(hll_error)
+    for _, chunk in read_fasta_chunks(filename, chunk_bases, overlap=k - 1):
+        codes, _ = kmer_codes(chunk, k)
+        if canonical:
+            codes = canonical_codes(codes, k)
+        cms.add(codes)
+        hll.add(codes)
+    return cms, hll
+
+
+def accuracy_report(codes: np.ndarray, counts: np.ndarray, cms: CountMinSketch, hll: HyperLogLog) -> Dict[str, float]:
+    # Compares the sketches against an exact (codes, counts) spectrum
+    estimates = cms.query(codes)
+    overestimate = estimates - counts
+    distinct = len(codes)
+    distinct_estimate = hll.cardinality()
+    return {
+        'distinct_exact': distinct,
+        'distinct_estimate': distinct_estimate,
+        'distinct_relative_error': abs(distinct_estimate - distinct) / distinct if distinct else 0.0,
+        'hll_expected_error': hll.error,
+        'count_mean_overestimate': float(overestimate.mean()) if distinct else 0.0,
+        'count_max_overestimate': int(overestimate.max()) if distinct else 0,
+        'count_error_bound': cms.error_bound(),
+        'count_within_bound': float(np.mean(overestimate <= cms.error_bound())) if distinct else 1.0,
+        'sketch_bytes': cms.table.nbytes + hll.registers.nbytes,
+    }
@@ -0,0 +1,88 @@
+from typing import Dict, Union
+
+import numpy as np
+
+from bioutils.packed import PackedSequence, as_packed
+
+# NCBI genetic codes, amino acids listed in TCAG codon order (TTT, TTC, TTA, TTG, TCT, ...)
+NCBI_TABLES = {
+    1: 'FFLLSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+    2: 'FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNKKSS**VVVVAAAADDEEGGGG',
+    3: 'FFLLSSSSYY**CCWWTTTTPPPPHHQQRRRRIIMMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+    4: 'FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+    5: 'FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNKKSSSSVVVVAAAADDEEGGGG',
+    6: 'FFLLSSSSYYQQCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+    9: 'FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNNKSSSSVVVVAAAADDEEGGGG',
+    10: 'FFLLSSSSYY**CCCWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+    11: 'FFLLSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+    12: 'FFLLSSSSYY**CC*WLLLSPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+}
+NCBI_BASE_ORDER = 'TCAG'
+
+THREE_LETTER = {
+    'A': 'Ala', 'R': 'Arg', 'N': 'Asn', 'D': 'Asp', 'C': 'Cys', 'Q': 'Gln', 'E': 'Glu', 'G': 'Gly',
+    'H': 'His', 'I': 'Ile', 'L': 'Leu', 'K': 'Lys', 'M': 'Met', 'F': 'Phe', 'P': 'Pro', 'S': 'Ser',
+    'T': 'Thr', 'W': 'Trp', 'Y': 'Tyr', 'V': 'Val', '*': 'Stop', 'X': 'X',
+}
+STOP = ord('*')
+UNKNOWN_CODON = 64  # codons touching an ambiguous base
+
+SequenceLike = Union[str, bytes, PackedSequence]
+
+
+def codon_table(table_id: int = 1) -> np.ndarray:
+    # 65-entry uint8 lookup indexed by 16 * b1 + 4 * b2 + b3 in our A/C/G/T coding; entry 64 is 'X'
+    if table_id not in NCBI_TABLES:
+        raise ValueError(f"Unsupported genetic code {table_id}, choose one of {sorted(NCBI_TABLES)}")
+    ncbi = NCBI_TABLES[table_id]
+    to_ncbi = [NCBI_BASE_ORDER.index(base) for base in 'ACGT']
+    table = np.empty(65, dtype=np.uint8)
+    for first in range(4):
+        for second in range(4):
+            for third in range(4):
+                ncbi_index = 16 * to_ncbi[first] + 4 * to_ncbi[second] + to_ncbi[third]
+                table[16 * first + 4 * second + third] = ord(ncbi[ncbi_index])
+    table[UNKNOWN_CODON] = ord('X')
+    return table
+
+
+def codon_indices(sequence: SequenceLike, frame: int = 0) -> np.ndarray:
+    # Codon index of every complete codon from `frame` on, 64 where a base is ambiguous
+    packed = as_packed(sequence)
+    codes = packed.codes[frame:]
+    count = len(codes) // 3
+    triplets = codes[:3 * count].reshape(count, 3).astype(np.int64)
+    indices = 16 * triplets[:, 0] + 4 * triplets[:, 1] + triplets[:, 2]
+    if len(packed.mask_starts):
+        ambiguous = packed.ambiguous_mask()[frame:frame + 3 * count].reshape(count, 3).any(axis=1)
+        indices[ambiguous] = UNKNOWN_CODON
+    return indices
+
+
+def translate_codes(indices: np.ndarray, table_id: int = 1, to_stop: bool = False) -> np.ndarray:
+    amino_acids = codon_table(table_id)[indices]
+    if to_stop:
+        stops = np.flatnonzero(amino_acids == STOP)
+        if len(stops):
+            amino_acids = amino_acids[:stops[0]]
+    return amino_acids
+
+
+def translate(sequence: SequenceLike, frame: int = 0, table_id: int = 1, to_stop: bool = False) -> str:
+    # One-letter protein; stops are '*' (read-through) unless to_stop cuts at the first one
+    return translate_codes(codon_indices(sequence, frame), table_id, to_stop).tobytes().decode('ascii')
+
+
+def translate_six_frames(sequence: SequenceLike, table_id: int = 1, to_stop: bool = False) -> Dict[int, str]:
+    # Frames +1..+3 on the given strand and -1..-3 on the reverse complement
+    packed = as_packed(sequence)
+    reverse = packed.reverse_complement()
+    frames = {}
+    for frame in range(3):
+        frames[frame + 1] = translate(packed, frame, table_id, to_stop)
+        frames[-(frame + 1)] = translate(reverse, frame, table_id, to_stop)
+    return frames
+
+
+def to_three_letter(protein: str) -> str:
+    return ''.join(THREE_LETTER.get(amino_acid, 'X') for amino_acid in protein)
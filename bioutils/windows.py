@@ -0,0 +1,62 @@
+from typing import Dict, Tuple, Union
+
+import numpy as np
+
+from bioutils.packed import PackedSequence
+
+DNA_ALPHABET = 'ACGT'
+IUPAC_ALPHABET = 'ACGTRYSWKMBDHVN'
+PROTEIN_ALPHABET = 'ACDEFGHIKLMNPQRSTVWY'
+
+SequenceLike = Union[str, bytes, PackedSequence]
+
+
+def _as_bytes(sequence: SequenceLike) -> np.ndarray:
+    if isinstance(sequence, PackedSequence):
+        sequence = sequence.to_bytes()
+    elif isinstance(sequence, str):
+        sequence = sequence.encode('ascii')
+    return np.frombuffer(sequence, dtype=np.uint8)
+
+
+def detect_alphabet(sequence: SequenceLike) -> str:
+    present = np.flatnonzero(np.bincount(_as_bytes(sequence), minlength=256))
+    symbols = set(bytes(present.astype(np.uint8)).decode('ascii').upper())
+    for alphabet in (DNA_ALPHABET, IUPAC_ALPHABET, PROTEIN_ALPHABET):
+        if symbols <= set(alphabet):
+            return alphabet
+    return ''.join(sorted(symbols))
+
+
+def window_starts(length: int, window_size: int, step: int = 1) -> np.ndarray:
+    if window_size <= 0 or step <= 0:
+        raise ValueError("window_size and step must be positive")
+    return np.arange(0, max(length - window_size + 1, 0), step, dtype=np.int64)
+
+
+def window_composition(sequence: SequenceLike, window_size: int, step: int = 1, alphabet: str = DNA_ALPHABET,
+                       relative: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    # Per-symbol prefix sums make every window O(1): counts = cum[start + w] - cum[start].
+    # Returns window start positions and a (len(alphabet), windows) array.
+    data = _as_bytes(sequence)
+    lookup = np.full(256, -1, dtype=np.int16)
+    for index, symbol in enumerate(alphabet):
+        lookup[ord(symbol.upper())] = index
+        lookup[ord(symbol.lower())] = index
+    symbols = lookup[data]
+
+    starts = window_starts(len(data), window_size, step)
+    result = np.empty((len(alphabet), len(starts)), dtype=np.float64 if relative else np.int64)
+    cumulative = np.zeros(len(data) + 1, dtype=np.int64)
+    for index in range(len(alphabet)):
+        np.cumsum(symbols == index, out=cumulative[1:])
+        result[index] = cumulative[starts + window_size] - cumulative[starts]
+    if relative:
+        result /= window_size
+    return starts, result
+
+
+def window_frequencies(sequence: SequenceLike, window_size: int, step: int = 1,
+                       alphabet: str = DNA_ALPHABET) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    starts, matrix = window_composition(sequence, window_size, step, alphabet)
+    return dict(zip(alphabet, matrix)), starts
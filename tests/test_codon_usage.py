@@ -0,0 +1,11 @@
+import numpy as np
+
+from bioutils.codon_usage import CODONS, cai
+
+
+def test_cai_skips_single_codon_amino_acids_of_the_selected_table():
+    weights = np.full(64, 0.5)
+    counts = np.zeros(64)
+    counts[CODONS.index('ATG')] = 10  # Met: one codon in table 1, ATG/ATA in table 2
+    assert np.isnan(cai(counts, weights, table_id=1))
+    assert cai(counts, weights, table_id=2) == 0.5
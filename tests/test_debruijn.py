@@ -0,0 +1,30 @@
+import numpy as np
+
+from bioutils.debruijn import assemble_debruijn
+from bioutils.read_sim import ErrorModel, simulate_reads
+
+COMPLEMENT = str.maketrans('ACGT', 'TGCA')
+
+
+def noisy_reads(genome, num_reads, seed=1):
+    # About 500x coverage, so the same substitution shows up in several reads
+    errors = ErrorModel(substitution=0.005)
+    return [read for batch in simulate_reads(genome, num_reads, 100, 150, errors=errors, seed=seed)
+            for read in batch.sequences()]
+
+
+def test_noisy_reads_assemble_into_the_genome():
+    genome = "".join(np.random.default_rng(0).choice(list('ACGT'), 10_000))
+    reads = noisy_reads(genome, 40_000)
+    for min_count in (None, 2):
+        contig, _ = assemble_debruijn(reads, min_count=min_count)[0]
+        assert len(contig) >= len(genome) - 10
+        assert contig in genome or contig.translate(COMPLEMENT)[::-1] in genome
+
+
+def test_forward_reads_assemble_in_their_orientation():
+    genome = "".join(np.random.default_rng(2).choice(list('ACGT'), 2_000))
+    reads = [read for batch in simulate_reads(genome, 500, 100, 150, seed=3) for read in batch.sequences()]
+    contigs = assemble_debruijn(reads, both_strands=False)
+    assert len(contigs) == 1
+    assert contigs[0][0] in genome and len(contigs[0][0]) > len(genome) - 30
@@ -0,0 +1,29 @@
+from bioutils.fasta import read_fasta_records
+from bioutils.fasta_index import FastaIndex, build_fasta_index
+
+LAYOUTS = {
+    'regular': ">a\nACGTA\nCGTAC\nGT\n>b desc\nTTTTT\nGG\n",
+    'blank_after_header': ">a\n\nACGTA\nCGTAC\nGT\n>b\n\n\nTTTTT\nGG\n\n",
+    'uneven_lines': ">a\nACGTACG\nTACGT\nACG\n>b\nTTT\nTTGG\n",
+    'blank_inside': ">a\nACGTA\n\nCGTAC\nGT\n>b\nTTTTT\nGG\n",
+    'crlf': ">a\r\nACGTA\r\nCGTAC\r\nGT\r\n>b\r\nttttt\r\nGG\r\n",
+}
+
+
+def test_fetch_matches_sequential_reading(tmp_path):
+    for layout, text in LAYOUTS.items():
+        path = tmp_path / f"{layout}.fasta"
+        path.write_bytes(text.encode('ascii'))
+        records = dict(read_fasta_records(str(path)))
+        with FastaIndex(str(path)) as index:
+            assert index.names == list(records), layout
+            for name, sequence in records.items():
+                assert index.length(name) == len(sequence), layout
+                assert index.fetch(name) == sequence, layout
+                assert index.fetch(name, 3, 9) == sequence[3:9], layout
+
+
+def test_blank_lines_before_bases_keep_the_record_indexed(tmp_path):
+    path = tmp_path / "genome.fasta"
+    path.write_text(LAYOUTS['blank_after_header'])
+    assert [entry.line_bases for entry in build_fasta_index(str(path))] == [5, 5]
@@ -0,0 +1,19 @@
+import gc
+import weakref
+
+import numpy as np
+
+from bioutils.kmer_db import KmerDatabase, write_kmer_db
+
+
+def test_close_releases_the_mapping(tmp_path):
+    path = str(tmp_path / "test.kmerdb")
+    write_kmer_db(path, np.array([5, 1, 2], dtype=np.uint64), np.array([4, 2, 1], dtype=np.uint64), k=3)
+    with KmerDatabase(path) as db:
+        assert db.query(np.array([1, 3, 5], dtype=np.uint64)).tolist() == [2, 0, 4]
+        mappings = [weakref.ref(db.codes), weakref.ref(db.counts)]
+    gc.collect()
+    assert all(mapping() is None for mapping in mappings)
+    write_kmer_db(path, np.array([7], dtype=np.uint64), np.array([9], dtype=np.uint64), k=3)
+    with KmerDatabase(path) as db:
+        assert db.query(np.array([7], dtype=np.uint64)).tolist() == [9]
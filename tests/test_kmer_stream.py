@@ -0,0 +1,21 @@
+import numpy as np
+
+from bioutils.kmer_stream import count_kmers_in_file
+from bioutils.kmers import count_codes, kmer_codes
+
+
+def test_sharded_counts_match_a_direct_count(tmp_path):
+    rng = np.random.default_rng(0)
+    records = ["".join(rng.choice(list('ACGTN'), 20_000, p=[0.2475] * 4 + [0.01])) for _ in range(3)]
+    path = tmp_path / "genome.fasta"
+    path.write_text("".join(f">r{i}\n{record}\n" for i, record in enumerate(records)))
+    tables = [count_codes(kmer_codes(record, 11)[0], 11) for record in records]
+    codes = np.concatenate([codes for codes, _ in tables])
+    counts = np.concatenate([counts for _, counts in tables])
+    expected = np.unique(codes)
+    expected_counts = np.bincount(np.searchsorted(expected, codes), weights=counts)
+    for spill_dir in (None, 'auto'):
+        found, found_counts = count_kmers_in_file(str(path), 11, chunk_bases=3_000, processes=2,
+                                                  spill_dir=spill_dir)
+        assert np.array_equal(found, expected)
+        assert np.array_equal(found_counts, expected_counts)
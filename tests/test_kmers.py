@@ -0,0 +1,34 @@
+import numpy as np
+
+from bioutils.kmers import kmer_codes
+
+CODES = {'A': 0, 'C': 1, 'G': 2, 'T': 3}
+
+
+def naive_kmer_codes(sequence, k):
+    codes, positions = [], []
+    for start in range(len(sequence) - k + 1):
+        window = sequence[start:start + k]
+        if 'N' in window:
+            continue
+        code = 0
+        for base in window:
+            code = code * 4 + CODES[base]
+        codes.append(code)
+        positions.append(start)
+    return codes, positions
+
+
+def test_kmer_codes_match_a_per_base_loop():
+    rng = np.random.default_rng(0)
+    sequence = "".join(rng.choice(list('ACGTN'), 400, p=[0.24, 0.24, 0.24, 0.24, 0.04]))
+    for k in range(1, 32):
+        codes, positions = kmer_codes(sequence, k)
+        expected_codes, expected_positions = naive_kmer_codes(sequence, k)
+        assert codes.tolist() == expected_codes
+        assert positions.tolist() == expected_positions
+
+
+def test_kmer_codes_shorter_than_k():
+    codes, positions = kmer_codes("ACG", 4)
+    assert len(codes) == 0 and len(positions) == 0
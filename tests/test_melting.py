@@ -0,0 +1,19 @@
+import importlib.util
+import math
+import os
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+spec = importlib.util.spec_from_file_location("l3_assign1", os.path.join(ROOT, "Project_L3", "assign1.py"))
+l3_assign1 = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(l3_assign1)
+
+
+def test_formula3_short_sequences_do_not_raise():
+    for dna in ("A", "g"):
+        assert l3_assign1.formula1(dna) > 0
+        assert not math.isnan(l3_assign1.formula2(dna))
+        assert math.isnan(l3_assign1.formula3(dna))
+
+
+def test_formula3_two_bases():
+    assert not math.isnan(l3_assign1.formula3("GC"))
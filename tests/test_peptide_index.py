@@ -0,0 +1,27 @@
+import importlib.util
+import os
+
+from bioutils.peptide_index import PeptideIndex
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+spec = importlib.util.spec_from_file_location("peptide_search", os.path.join(ROOT, "Project_L4", "peptide_search.py"))
+peptide_search = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(peptide_search)
+
+
+def test_saved_index_keeps_its_genetic_code(tmp_path):
+    index = PeptideIndex.build([("g", "ATGAAATGATAGTGGCCC")], table_id=2, seed_length=4)
+    path = str(tmp_path / "g.pepidx.npz")
+    index.save(path)
+    loaded = PeptideIndex.load(path)
+    assert (loaded.table_id, loaded.seed_length) == (2, 4)
+
+
+def test_cached_index_is_rebuilt_for_other_settings(tmp_path):
+    fasta = tmp_path / "g.fasta"
+    fasta.write_text(">g\nATGAAATGATAGTGGCCCAAATGG\n")
+    assert peptide_search.load_index([str(fasta)], 1).search("MK*") != []
+    # TGA reads as Trp instead of stop in table 2
+    rebuilt = peptide_search.load_index([str(fasta)], 2)
+    assert rebuilt.table_id == 2 and rebuilt.search("MK*") == [] and rebuilt.search("MKW") != []
+    assert peptide_search.load_index([str(fasta)], 2, 3).seed_length == 3
@@ -0,0 +1,47 @@
+import numpy as np
+
+from bioutils.read_sim import ErrorModel, simulate_pairs, simulate_reads
+
+COMPLEMENT = str.maketrans('ACGTN', 'TGCAN')
+
+
+def reverse_complement(sequence):
+    return sequence.translate(COMPLEMENT)[::-1]
+
+
+def random_genome(length, seed=0):
+    return "".join(np.random.default_rng(seed).choice(list('ACGT'), length))
+
+
+def test_mate_two_starts_at_fragment_end_with_indels():
+    genome = random_genome(5000)
+    errors = ErrorModel(insertion=0.01, deletion=0.03)
+    forward, mates = next(simulate_pairs(genome, 500, read_length=100, insert_mean=300, insert_sd=0,
+                                         errors=errors, seed=1))
+    sequences = mates.sequences()
+    lengths = np.diff(mates.offsets)
+    ends = forward.starts + 300
+    assert np.array_equal(mates.starts + lengths, ends)
+    # The 5' end of mate 2 reads the fragment end unless an error hit its first bases
+    matching = [sequence[:8] == reverse_complement(genome[end - 8:end])
+                for sequence, end in zip(sequences, ends.tolist())]
+    assert np.mean(matching) > 0.6
+
+
+def test_reads_match_reported_positions_without_errors():
+    genome = random_genome(2000)
+    for batch in simulate_reads(genome, 300, 20, 60, both_strands=True, seed=2):
+        for sequence, start, strand in zip(batch.sequences(), batch.starts.tolist(), batch.strands.tolist()):
+            template = genome[start:start + len(sequence)]
+            assert sequence == (template if strand == 1 else reverse_complement(template))
+
+
+def test_n_runs_are_written_as_n():
+    genome = random_genome(300) + "N" * 200 + random_genome(300, seed=1)
+    errors = ErrorModel(substitution=0.1)
+    for batch in simulate_reads(genome, 300, 50, 80, errors=errors, both_strands=True, seed=3):
+        for sequence, start, strand in zip(batch.sequences(), batch.starts.tolist(), batch.strands.tolist()):
+            template = genome[start:start + len(sequence)]
+            if strand == -1:
+                template = reverse_complement(template)
+            assert [base == 'N' for base in sequence] == [base == 'N' for base in template]